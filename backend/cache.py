@@ -0,0 +1,101 @@
+"""
+바이트 예산 기반 LRU 캐시 (에피소드 프레임 / 썸네일 캐시용)
+"""
+
+import sys
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """항목별 크기를 기록하고 총 크기가 예산을 넘으면 가장 오래 안 쓴 항목부터 제거하는 캐시"""
+
+    def __init__(self, name, max_bytes):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key → (value, size)
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """값을 반환하고 최근 사용으로 표시 (없으면 default)"""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, size):
+        """값을 저장하고 예산을 넘으면 오래된 항목부터 제거"""
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key)[1]
+
+            # 예산보다 큰 항목은 다른 항목을 모두 밀어내므로 저장하지 않음
+            if size > self.max_bytes:
+                self.rejections += 1
+                return False
+
+            self._entries[key] = (value, size)
+            self._current_bytes += size
+
+            while self._current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+                self.evictions += 1
+            return True
+
+    def clear(self):
+        """모든 항목 제거 후 제거된 항목 수 반환"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._current_bytes = 0
+            return count
+
+    def stats(self):
+        """히트/미스/제거 카운터와 사용량 반환"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "usage_percent": (
+                    self._current_bytes / self.max_bytes * 100 if self.max_bytes else 0.0
+                ),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "rejections": self.rejections,
+            }
+
+
+def estimate_size(value):
+    """응답 객체(dict/list/str/bytes/숫자)의 대략적인 메모리 크기(바이트) 계산"""
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
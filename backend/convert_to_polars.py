@@ -13,7 +13,31 @@ from PIL import Image
 import datasets
 from tqdm import tqdm
 import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import pyarrow.parquet as pq
+
+from libero_data import (
+    SCHEMA_VERSION,
+    VECTOR_COLUMNS,
+    list_parquet_files,
+    detect_schema_version,
+    scan_frames,
+    save_episode_index,
+    save_dataset_manifest,
+    save_episode_previews,
+    export_ipc_snapshot,
+    export_jpeg_packs,
+    with_frame_hashes,
+    HASH_COLUMNS,
+    SPRITE_FRAME_STEP,
+    IMAGE_MAX_SIZES,
+    IMAGE_QUALITIES,
+    LADDER_QUALITIES,
+    DEFAULT_QUALITY_LADDER,
+    ladder_column,
+)
 
 # 로깅 설정
 logging.basicConfig(
@@ -24,8 +48,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def image_to_base64_optimized(img_array, quality=75, max_size=512):
-    """이미지를 최적화된 base64로 변환"""
+def image_to_jpeg_optimized(img_array, quality=75, max_size=512):
+    """이미지를 최적화된 JPEG 바이트로 변환"""
     try:
         if isinstance(img_array, np.ndarray):
             if img_array.dtype != np.uint8:
@@ -34,97 +58,479 @@ def image_to_base64_optimized(img_array, quality=75, max_size=512):
         else:
             img = img_array
 
-        # 크기 최적화
+        # 크기 최적화 (같은 원본으로 여러 크기를 만들 수 있도록 복사본을 줄임)
         if max_size and (img.width > max_size or img.height > max_size):
+            img = img.copy()
             img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
 
         buffer = io.BytesIO()
-        if img.mode == "RGBA":
+        if img.mode not in JPEG_PASSTHROUGH_MODES:
             img = img.convert("RGB")
         img.save(buffer, format="JPEG", quality=quality, optimize=True)
 
-        return base64.b64encode(buffer.getvalue()).decode()
+        return buffer.getvalue()
     except Exception as e:
         logger.error(f"이미지 변환 실패: {e}")
         return None
 
 
-def convert_libero_to_parquet(output_dir="data", sample_size=None):
-    """Libero 데이터셋을 Parquet으로 변환"""
-    logger.info("🤖 Libero 데이터셋 로딩 시작...")
+def open_source_image(value):
+    """원본 이미지 값을 (PIL 이미지, 인코딩된 바이트 또는 None)으로 변환
 
-    try:
-        # 데이터셋 로드
-        dataset = datasets.load_dataset("physical-intelligence/libero")
-        train_data = dataset["train"]
+    Image(decode=False) 값({"bytes", "path"})은 헤더만 읽은 지연 로드 이미지로 열어,
+    실제 디코딩은 크기 조정이나 다시 인코딩이 필요할 때 한 번만 일어난다.
+    """
+    if isinstance(value, dict):
+        encoded = value.get("bytes")
+        if encoded is None:
+            with open(value["path"], "rb") as f:
+                encoded = f.read()
+        return Image.open(io.BytesIO(encoded)), encoded
+    return value, None
 
-        logger.info(f"📊 총 데이터 크기: {len(train_data)}")
 
-        # 샘플링 (테스트용)
-        if sample_size:
-            indices = list(range(0, len(train_data), len(train_data) // sample_size))
-            train_data = train_data.select(indices)
-            logger.info(f"🎯 샘플링된 데이터 크기: {len(train_data)}")
+def passthrough_jpeg(img, encoded, max_size):
+    """원본이 이미 조건에 맞는 JPEG면 인코딩된 바이트를 그대로 반환, 아니면 None
 
-        # 데이터 변환
-        logger.info("🔄 데이터 변환 시작...")
+    JPEG 형식, RGB/흑백, max_size 이하, 픽셀당 바이트가 상한 이하(지나치게 높은 품질 제외)일 때만 통과.
+    """
+    if encoded is None or img.format != "JPEG" or img.mode not in JPEG_PASSTHROUGH_MODES:
+        return None
+    if max_size and (img.width > max_size or img.height > max_size):
+        return None
+    if len(encoded) > img.width * img.height * JPEG_PASSTHROUGH_MAX_BYTES_PER_PIXEL:
+        return None
+    return encoded
 
-        converted_data = []
 
-        for i, row in enumerate(tqdm(train_data, desc="변환 중")):
-            try:
-                # 이미지 변환 (메인 카메라)
-                main_image_b64 = image_to_base64_optimized(
-                    row["image"], quality=75, max_size=512
-                )
+def image_to_base64_optimized(img_array, quality=75, max_size=512):
+    """이미지를 최적화된 base64로 변환 (v1 스키마 호환용)"""
+    jpeg_bytes = image_to_jpeg_optimized(img_array, quality, max_size)
+    if jpeg_bytes is None:
+        return None
+    return base64.b64encode(jpeg_bytes).decode()
+
+
+# 원본 JPEG를 다시 인코딩하지 않고 그대로 저장할 수 있는 조건
+JPEG_PASSTHROUGH_MODES = ("RGB", "L")
+JPEG_PASSTHROUGH_MAX_BYTES_PER_PIXEL = 1.0  # 대략 JPEG 품질 95 이하
+
+# 변환 파이프라인 설정
+LIBERO_DATASET = "physical-intelligence/libero"
+DEFAULT_SHARD_SIZE = 10000  # 배치 파일 하나에 들어갈 원본 행 수
+DEFAULT_CHUNK_SIZE = 256  # 워커 작업 단위 = 출력 row group 크기
+CONVERSION_MANIFEST_FILE = "conversion_manifest.json"
+DEFAULT_MERGE_ROW_GROUP_ROWS = 1000  # 병합 파일 row group 목표 행 수 (에피소드 단위로 끊음)
+
+# 워커 프로세스별 데이터셋 핸들
+_worker_dataset = None
+
+
+def _init_worker(dataset=None):
+    """워커에서 데이터셋을 한 번만 로드 (HF Arrow 캐시를 메모리 매핑하므로 복사 없음)
+
+    이미지 컬럼은 decode=False로 읽어 인코딩된 원본 바이트를 받는다 (필요할 때만 직접 디코딩).
+    """
+    global _worker_dataset
+    if dataset is None:
+        dataset = datasets.load_dataset(LIBERO_DATASET)["train"]
+    for column, feature in dataset.features.items():
+        if isinstance(feature, datasets.Image) and feature.decode:
+            dataset = dataset.cast_column(column, datasets.Image(decode=False))
+    _worker_dataset = dataset
+
+
+def frames_to_dataframe(rows):
+    """변환된 프레임 레코드 목록을 현재 스키마의 DataFrame으로 변환 (카메라별 dHash 컬럼 포함)"""
+    return with_frame_hashes(
+        pl.DataFrame(rows).with_columns(
+            [
+                pl.col(column).cast(pl.Array(pl.Float32, width))
+                for column, width in VECTOR_COLUMNS.items()
+            ]
+        )
+    )
+
 
-                # 이미지 변환 (손목 카메라)
-                wrist_image_b64 = image_to_base64_optimized(
-                    row["wrist_image"], quality=70, max_size=256
+def convert_rows(indices, quality_ladder=(), passthrough=True):
+    """원본 인덱스 묶음을 변환하여 (프레임 DataFrame, 스킵된 인덱스) 반환 (워커에서 실행)
+
+    quality_ladder가 주어지면 원본보다 작은 각 크기의 이미지 컬럼(예: main_image_128)도 만든다.
+    passthrough면 이미 조건에 맞는 원본 JPEG는 디코딩/재인코딩 없이 그대로 저장한다.
+    """
+    batch = _worker_dataset[indices]
+    rows = []
+    skipped = []
+    source_columns = {"main_image": "image", "wrist_image": "wrist_image"}
+
+    for position, source_index in enumerate(indices):
+        try:
+            # 이미지 변환 (메인 카메라 512px, 손목 카메라 256px) - JPEG 바이트 그대로 저장
+            images = {}
+            for column, source_column in source_columns.items():
+                source_image, encoded = open_source_image(batch[source_column][position])
+                images[column] = (
+                    passthrough and passthrough_jpeg(source_image, encoded, IMAGE_MAX_SIZES[column])
+                ) or image_to_jpeg_optimized(
+                    source_image, quality=IMAGE_QUALITIES[column], max_size=IMAGE_MAX_SIZES[column]
                 )
+                for size in quality_ladder:
+                    if size < IMAGE_MAX_SIZES[column]:
+                        images[ladder_column(column, size)] = image_to_jpeg_optimized(
+                            source_image, quality=LADDER_QUALITIES.get(size, 70), max_size=size
+                        )
+
+            if any(jpeg_bytes is None for jpeg_bytes in images.values()):
+                logger.warning(f"⚠️  인덱스 {source_index} 이미지 변환 실패, 스킵")
+                skipped.append(source_index)
+                continue
 
-                if main_image_b64 is None or wrist_image_b64 is None:
-                    logger.warning(f"⚠️  인덱스 {i} 이미지 변환 실패, 스킵")
-                    continue
-
-                converted_row = {
-                    "episode_index": int(row["episode_index"]),
-                    "frame_index": int(row["frame_index"]),
-                    "task_index": int(row["task_index"]),
-                    "timestamp": float(row["timestamp"]),
-                    "main_image": main_image_b64,
-                    "wrist_image": wrist_image_b64,
-                    "state": json.dumps(
-                        [float(x) for x in row["state"]]
-                    ),  # JSON 문자열로 저장
-                    "actions": json.dumps(
-                        [float(x) for x in row["actions"]]
-                    ),  # JSON 문자열로 저장
+            main_image_jpeg = images.pop("main_image")
+            wrist_image_jpeg = images.pop("wrist_image")
+            rows.append(
+                {
+                    "episode_index": int(batch["episode_index"][position]),
+                    "frame_index": int(batch["frame_index"][position]),
+                    "task_index": int(batch["task_index"][position]),
+                    "timestamp": float(batch["timestamp"][position]),
+                    "main_image": main_image_jpeg,
+                    "wrist_image": wrist_image_jpeg,
+                    "state": [float(x) for x in batch["state"][position]],
+                    "actions": [float(x) for x in batch["actions"][position]],
+                    **images,
                 }
+            )
+        except Exception as e:
+            logger.error(f"❌ 인덱스 {source_index} 처리 실패: {e}")
+            skipped.append(source_index)
 
-                converted_data.append(converted_row)
+    return (frames_to_dataframe(rows) if rows else None), skipped
 
-                # 메모리 관리를 위해 중간에 저장
-                if len(converted_data) >= 1000:
-                    logger.info(f"💾 중간 저장 ({len(converted_data)} 항목)")
-                    save_batch(converted_data, output_dir, i // 1000)
-                    converted_data = []
 
-            except Exception as e:
-                logger.error(f"❌ 인덱스 {i} 처리 실패: {e}")
-                continue
+class ShardWriter:
+    """배치 파일 하나를 임시 파일에 row group 단위로 스트리밍 저장하고 완료 시 원자적으로 교체"""
 
-        # 남은 데이터 저장
-        if converted_data:
-            save_batch(converted_data, output_dir, "final")
+    def __init__(self, output_dir, shard_num):
+        self.path = os.path.join(output_dir, f"libero_batch_{shard_num}.parquet")
+        self.tmp_path = self.path + ".tmp"
+        self.writer = None
+        self.rows = 0
+        self.skipped = []
+
+    def write(self, chunk_df, skipped):
+        self.skipped.extend(skipped)
+        if chunk_df is None:
+            return
+        table = chunk_df.to_arrow()
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.tmp_path, table.schema, compression="snappy")
+        self.writer.write_table(table)
+        self.rows += chunk_df.height
+
+    def commit(self):
+        """임시 파일을 최종 배치 파일로 교체하고 파일 이름 반환 (행이 없으면 None)"""
+        if self.writer is None:
+            return None
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+        return os.path.basename(self.path)
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def load_conversion_manifest(output_dir, config):
+    """변환 매니페스트(완료된 배치와 원본 범위)를 읽거나 새로 만듦"""
+    path = os.path.join(output_dir, CONVERSION_MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {**config, "shards": {}}
+
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    changed = [key for key, value in config.items() if manifest.get(key) != value]
+    if changed:
+        raise ValueError(
+            f"기존 변환 매니페스트와 설정이 다릅니다 ({', '.join(changed)}). "
+            "같은 설정으로 다시 실행하거나 --restart로 처음부터 변환하세요."
+        )
+    return manifest
+
+
+def save_conversion_manifest(output_dir, manifest):
+    """매니페스트를 임시 파일에 쓴 뒤 교체 (중간에 중단되어도 손상되지 않음)"""
+    path = os.path.join(output_dir, CONVERSION_MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def shard_completed(output_dir, shard):
+    """매니페스트에 기록된 배치가 실제 파일과 일치하는지 확인"""
+    if shard is None:
+        return False
+    if shard["file"] is None:
+        return shard["rows"] == 0
+    path = os.path.join(output_dir, shard["file"])
+    return os.path.exists(path) and pq.ParquetFile(path).metadata.num_rows == shard["rows"]
+
+
+def coverage_problems(manifest):
+    """배치들의 원본 범위가 0부터 source_count까지 빈틈/중복 없이 이어지는지 확인"""
+    problems = []
+    expected_start = 0
+    for shard in sorted(manifest["shards"].values(), key=lambda item: item["source_start"]):
+        if shard["source_start"] != expected_start:
+            problems.append(
+                f"원본 범위 {expected_start}-{shard['source_start']} "
+                + ("누락" if shard["source_start"] > expected_start else "중복")
+            )
+        expected_start = max(expected_start, shard["source_end"])
+
+    if expected_start != manifest["source_count"]:
+        problems.append(f"원본 범위 {expected_start}-{manifest['source_count']} 누락")
+    return problems
+
+
+def shard_file_problems(output_dir, manifest, parquet_files):
+    """배치별 행 수(+스킵)가 범위와 맞는지, 파일이 매니페스트와 일치하는지, 기록 안 된 파일이 없는지 확인"""
+    problems = []
+    for shard in manifest["shards"].values():
+        covered = shard["rows"] + len(shard["skipped"])
+        if covered != shard["source_end"] - shard["source_start"]:
+            problems.append(
+                f"{shard['file']}: 행 {shard['rows']} + 스킵 {len(shard['skipped'])} ≠ "
+                f"범위 {shard['source_end'] - shard['source_start']}"
+            )
+        if not shard_completed(output_dir, shard):
+            problems.append(f"{shard['file']}: 파일이 없거나 행 수가 매니페스트와 다름")
+
+    recorded_files = {shard["file"] for shard in manifest["shards"].values()}
+    for stray in sorted({os.path.basename(f) for f in parquet_files} - recorded_files):
+        problems.append(f"{stray}: 매니페스트에 없는 배치 파일")
+    return problems
+
+
+def duplicate_frame_problems(parquet_files):
+    """배치 파일 전체에서 (episode_index, frame_index)가 중복되는 프레임 확인"""
+    if not parquet_files:
+        return []
+    duplicated = (
+        scan_frames(parquet_files)
+        .group_by("episode_index", "frame_index")
+        .agg(pl.len().alias("count"))
+        .filter(pl.col("count") > 1)
+        .collect()
+    )
+    if duplicated.height:
+        return [f"(episode_index, frame_index) 중복 {duplicated.height}건"]
+    return []
+
+
+def verify_conversion(output_dir="data"):
+    """배치 파일들이 원본 범위를 빈틈/중복 없이 정확히 한 번씩 덮는지 검증"""
+    path = os.path.join(output_dir, CONVERSION_MANIFEST_FILE)
+    if not os.path.exists(path):
+        logger.error(f"❌ 변환 매니페스트가 없습니다: {path}")
+        return False
+
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    parquet_files = list_parquet_files(output_dir)
+    problems = [
+        *coverage_problems(manifest),
+        *shard_file_problems(output_dir, manifest, parquet_files),
+        *duplicate_frame_problems(parquet_files),
+    ]
+
+    for problem in problems:
+        logger.error(f"❌ 검증 실패: {problem}")
+    if not problems:
+        logger.info(
+            f"✅ 검증 완료: 배치 {len(manifest['shards'])}개가 원본 {manifest['source_count']}행을 정확히 한 번씩 포함"
+        )
+    return not problems
+
+
+def iter_converted_chunks(tasks, workers, dataset=None, quality_ladder=(), passthrough=True):
+    """변환 작업을 순서대로 결과를 내보내되 동시에 처리 중인 청크 수를 제한 (메모리 상한 유지)"""
+    if workers <= 1:
+        _init_worker(dataset)
+        for task in tasks:
+            yield task, convert_rows(task[1], quality_ladder, passthrough)
+        return
+
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append((task, executor.submit(convert_rows, task[1], quality_ladder, passthrough)))
+            if len(pending) >= max_in_flight:
+                done_task, future = pending.popleft()
+                yield done_task, future.result()
+        while pending:
+            done_task, future = pending.popleft()
+            yield done_task, future.result()
+
+
+def reset_conversion(output_dir):
+    """--restart: 기존 배치 파일과 변환 매니페스트 삭제"""
+    for path in list_parquet_files(output_dir):
+        os.remove(path)
+    manifest_path = os.path.join(output_dir, CONVERSION_MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    logger.info("🧹 기존 배치 파일과 매니페스트를 지우고 처음부터 변환합니다")
+
+
+def plan_shard_ranges(source_count, shard_size):
+    """배치 번호 → 원본 인덱스 목록에서의 [시작, 끝) 범위"""
+    return {
+        shard_start // shard_size: (shard_start, min(shard_start + shard_size, source_count))
+        for shard_start in range(0, source_count, shard_size)
+    }
+
+
+def plan_chunk_tasks(source_indices, shard_ranges, pending_shards, chunk_size):
+    """남은 배치들을 chunk_size 단위 (배치 번호, 원본 인덱스 목록) 작업으로 나눔
+
+    청크는 배치 끝을 넘지 않도록 자른다 (넘으면 다음 배치의 행이 중복 저장됨).
+    """
+    return [
+        (
+            shard_num,
+            source_indices[chunk_start : min(chunk_start + chunk_size, shard_ranges[shard_num][1])],
+        )
+        for shard_num in pending_shards
+        for chunk_start in range(*shard_ranges[shard_num], chunk_size)
+    ]
+
+
+def write_shards(output_dir, converted_chunks, total_rows, commit_shard):
+    """변환된 청크를 배치별 ShardWriter로 이어 쓰고, 배치가 끝날 때마다 commit_shard(writer, 배치 번호) 호출"""
+    shard_writer = None
+    shard_num = None
+    progress = tqdm(total=total_rows, desc="변환 중")
+    try:
+        for (chunk_shard, chunk_indices), (chunk_df, skipped) in converted_chunks:
+            progress.update(len(chunk_indices))
+            if chunk_shard != shard_num:
+                if shard_writer is not None:
+                    commit_shard(shard_writer, shard_num)
+                shard_writer, shard_num = ShardWriter(output_dir, chunk_shard), chunk_shard
+            shard_writer.write(chunk_df, skipped)
+
+        if shard_writer is not None:
+            commit_shard(shard_writer, shard_num)
+            shard_writer = None
+    finally:
+        progress.close()
+        # 완료되지 않은 배치는 임시 파일만 지우고 다음 실행에서 다시 변환
+        if shard_writer is not None:
+            shard_writer.abort()
+
+
+def convert_libero_to_parquet(
+    output_dir="data",
+    sample_size=None,
+    workers=1,
+    shard_size=DEFAULT_SHARD_SIZE,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    restart=False,
+    quality_ladder=(),
+    passthrough=True,
+):
+    """Libero 데이터셋을 Parquet으로 변환
+
+    원본 인덱스를 shard_size 단위 배치 파일로 나누고, 각 배치는 chunk_size 행씩 워커 프로세스에서
+    인코딩한 결과를 하나의 ParquetWriter로 row group 단위 스트리밍 저장한다.
+    완료된 배치는 매니페스트에 기록되므로 중단 후 다시 실행하면 남은 배치만 변환한다.
+    passthrough면 이미 조건에 맞는 원본 JPEG는 다시 인코딩하지 않고 그대로 복사한다.
+    """
+    logger.info("🤖 Libero 데이터셋 로딩 시작...")
+
+    try:
+        # 데이터셋 로드
+        dataset = datasets.load_dataset(LIBERO_DATASET)
+        train_data = dataset["train"]
+
+        logger.info(f"📊 총 데이터 크기: {len(train_data)}")
+
+        source_indices = list(range(len(train_data)))
+
+        # 샘플링 (테스트용)
+        if sample_size:
+            source_indices = list(range(0, len(train_data), len(train_data) // sample_size))
+            train_data = train_data.select(source_indices)
+            logger.info(f"🎯 샘플링된 데이터 크기: {len(train_data)}")
+
+        # 매니페스트로 완료된 배치를 확인하여 남은 범위만 변환
+        os.makedirs(output_dir, exist_ok=True)
+        if restart:
+            reset_conversion(output_dir)
+
+        manifest = load_conversion_manifest(
+            output_dir,
+            {
+                "dataset": LIBERO_DATASET,
+                "source_rows": len(dataset["train"]),
+                "sample_size": sample_size,
+                "shard_size": shard_size,
+                "source_count": len(source_indices),
+                # 배치 파일마다 컬럼 구성이 같도록 화질 단계도 이어서 변환할 때 같아야 함
+                "quality_ladder": sorted(quality_ladder) or None,
+                "jpeg_passthrough": passthrough,
+            },
+        )
+
+        shard_ranges = plan_shard_ranges(len(source_indices), shard_size)
+        pending_shards = [
+            shard_num
+            for shard_num in shard_ranges
+            if not shard_completed(output_dir, manifest["shards"].get(str(shard_num)))
+        ]
+        logger.info(
+            f"🔄 데이터 변환 시작... (워커 {workers}개, 배치 {len(pending_shards)}/{len(shard_ranges)}개 남음)"
+        )
+        tasks = plan_chunk_tasks(source_indices, shard_ranges, pending_shards, chunk_size)
+
+        def commit_shard(shard_writer, shard_num):
+            shard_start, shard_end = shard_ranges[shard_num]
+            manifest["shards"][str(shard_num)] = {
+                "file": shard_writer.commit(),
+                "source_start": shard_start,
+                "source_end": shard_end,
+                "first_source_index": source_indices[shard_start],
+                "last_source_index": source_indices[shard_end - 1],
+                "rows": shard_writer.rows,
+                "skipped": shard_writer.skipped,
+                "completed_at": datetime.now().isoformat(),
+            }
+            save_conversion_manifest(output_dir, manifest)
+            logger.info(f"✅ 배치 {shard_num} 저장 완료 ({shard_writer.rows}행)")
+
+        write_shards(
+            output_dir,
+            iter_converted_chunks(tasks, workers, dataset["train"], quality_ladder, passthrough),
+            sum(len(task[1]) for task in tasks),
+            commit_shard,
+        )
 
         logger.info("✅ 데이터 변환 완료!")
 
-        # 메타데이터 저장
+        if not verify_conversion(output_dir):
+            raise RuntimeError("배치 파일 검증에 실패했습니다")
+
+        # 메타데이터 저장 (이미지 컬럼을 디코딩하지 않도록 정수 컬럼만 선택해서 집계)
+        key_columns = train_data.select_columns(["episode_index", "task_index"])
         metadata = {
             "total_frames": len(train_data),
-            "total_episodes": len(set(row["episode_index"] for row in train_data)),
-            "total_tasks": len(set(row["task_index"] for row in train_data)),
+            "total_episodes": len(key_columns.unique("episode_index")),
+            "total_tasks": len(key_columns.unique("task_index")),
             "conversion_time": datetime.now().isoformat(),
             "sample_size": sample_size,
         }
@@ -139,56 +545,161 @@ def convert_libero_to_parquet(output_dir="data", sample_size=None):
         raise
 
 
-def save_batch(data, output_dir, batch_num):
-    """데이터 배치를 Parquet으로 저장"""
-    try:
-        os.makedirs(output_dir, exist_ok=True)
-
-        # Polars DataFrame 생성
-        df = pl.DataFrame(data)
-
-        # Parquet으로 저장
-        output_path = os.path.join(output_dir, f"libero_batch_{batch_num}.parquet")
-        df.write_parquet(output_path, compression="snappy")
+def migrate_schema(input_dir="data"):
+    """이전 스키마(v1/v2) 배치 파일들을 현재 스키마(v3)로 변환"""
+    parquet_files = list_parquet_files(input_dir)
+    legacy_files = [
+        f for f in parquet_files if detect_schema_version(f) < SCHEMA_VERSION
+    ]
 
-        logger.info(f"✅ 배치 {batch_num} 저장 완료: {output_path}")
-
-    except Exception as e:
-        logger.error(f"❌ 배치 {batch_num} 저장 실패: {e}")
-        raise
+    if not legacy_files:
+        logger.info("✅ 마이그레이션할 이전 스키마 파일이 없습니다")
+        return
 
+    logger.info(
+        f"🔄 v{SCHEMA_VERSION} 마이그레이션 시작 ({len(legacy_files)}/{len(parquet_files)}개 파일)"
+    )
 
-def merge_parquet_files(input_dir="data", output_file="data/libero_complete.parquet"):
-    """여러 Parquet 파일을 하나로 합치기"""
+    for path in tqdm(legacy_files, desc="마이그레이션 중"):
+        # 이미지 base64 디코딩, state/actions JSON → float32 배열 변환
+        df = scan_frames([path]).collect()
+        # 중간에 실패해도 원본이 손상되지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = path + ".tmp"
+        df.write_parquet(tmp_path, compression="snappy", use_pyarrow=True)
+        os.replace(tmp_path, path)
+
+    logger.info(f"✅ v{SCHEMA_VERSION} 마이그레이션 완료")
+
+
+def add_frame_hashes(input_dir="data"):
+    """dHash 컬럼이 없는 배치 파일에 카메라별 지각 해시 컬럼을 추가"""
+    parquet_files = list_parquet_files(input_dir)
+    missing_files = [
+        f
+        for f in parquet_files
+        if not all(column in pl.read_parquet_schema(f) for column in HASH_COLUMNS)
+    ]
+
+    if not missing_files:
+        logger.info("✅ 모든 배치 파일에 프레임 해시 컬럼이 있습니다")
+        return
+
+    logger.info(f"🔄 프레임 해시 추가 시작 ({len(missing_files)}/{len(parquet_files)}개 파일)")
+
+    for path in tqdm(missing_files, desc="해시 계산 중"):
+        df = with_frame_hashes(scan_frames([path]).collect())
+        # 중간에 실패해도 원본이 손상되지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = path + ".tmp"
+        df.write_parquet(tmp_path, compression="snappy", use_pyarrow=True)
+        os.replace(tmp_path, path)
+
+    logger.info("✅ 프레임 해시 추가 완료")
+
+
+def plan_merge_groups(episode_rows, row_group_rows):
+    """정렬된 (episode_index, 행 수) 목록을 에피소드 경계에 맞춘 row group 단위로 묶음"""
+    groups = []
+    current, current_rows = [], 0
+    for episode_index, rows in episode_rows:
+        current.append(episode_index)
+        current_rows += rows
+        if current_rows >= row_group_rows:
+            groups.append(current)
+            current, current_rows = [], 0
+    if current:
+        groups.append(current)
+    return groups
+
+
+def merge_parquet_files(
+    input_dir="data", output_file=None, row_group_rows=DEFAULT_MERGE_ROW_GROUP_ROWS
+):
+    """여러 Parquet 파일을 (episode_index, frame_index) 순으로 하나로 합치기 (스트리밍 외부 병합)
+
+    1) 키 컬럼만 읽어 파일별로 어떤 에피소드가 있는지 파악하고
+    2) 에피소드 경계에 맞춰 출력 row group을 나눈 뒤
+    3) row group마다 해당 에피소드 범위만 필터로 읽어 정렬 후 바로 기록한다.
+    메모리에는 키 테이블과 row group 하나 분량의 데이터만 올라간다.
+    """
     try:
         logger.info("🔗 Parquet 파일들 합치는 중...")
 
-        parquet_files = [
-            f for f in os.listdir(input_dir) if f.endswith(".parquet") and "batch" in f
-        ]
+        if output_file is None:
+            output_file = os.path.join(input_dir, "libero_complete.parquet")
+
+        parquet_files = list_parquet_files(input_dir)
 
         if not parquet_files:
             logger.error("❌ Parquet 파일을 찾을 수 없습니다")
             return
 
-        # 첫 번째 파일로 시작
-        df = pl.read_parquet(os.path.join(input_dir, parquet_files[0]))
-
-        # 나머지 파일들 합치기
-        for file in tqdm(parquet_files[1:], desc="파일 합치는 중"):
-            batch_df = pl.read_parquet(os.path.join(input_dir, file))
-            df = pl.concat([df, batch_df])
+        # 키 컬럼만 읽어서 (파일, 에피소드)별 행 수 집계 (이미지 컬럼은 읽지 않음)
+        episode_files = (
+            pl.concat(
+                [
+                    pl.scan_parquet(path)
+                    .select("episode_index")
+                    .with_columns(pl.lit(file_id).alias("file_id"))
+                    for file_id, path in enumerate(parquet_files)
+                ]
+            )
+            .group_by("episode_index", "file_id")
+            .agg(pl.len().alias("rows"))
+            .collect()
+        )
+        episode_rows = (
+            episode_files.group_by("episode_index")
+            .agg(pl.sum("rows"))
+            .sort("episode_index")
+            .rows()
+        )
+        groups = plan_merge_groups(episode_rows, row_group_rows)
+
+        writer = None
+        total_rows = 0
+        tmp_file = output_file + ".tmp"
+        try:
+            for episodes in tqdm(groups, desc="파일 합치는 중"):
+                first_episode, last_episode = episodes[0], episodes[-1]
+                file_ids = (
+                    episode_files.filter(
+                        pl.col("episode_index").is_between(first_episode, last_episode)
+                    )["file_id"]
+                    .unique()
+                    .sort()
+                    .to_list()
+                )
+                # 에피소드 범위 필터는 row group min/max 통계로 pruning됨
+                group_df = (
+                    pl.concat(
+                        [
+                            scan_frames([parquet_files[file_id]]).filter(
+                                pl.col("episode_index").is_between(first_episode, last_episode)
+                            )
+                            for file_id in file_ids
+                        ]
+                    )
+                    .sort(["episode_index", "frame_index"])
+                    .collect()
+                )
 
-        # 정렬 (episode_index, frame_index 순)
-        df = df.sort(["episode_index", "frame_index"])
+                table = group_df.to_arrow()
+                if writer is None:
+                    writer = pq.ParquetWriter(
+                        tmp_file, table.schema, compression="snappy", write_statistics=True
+                    )
+                writer.write_table(table, row_group_size=table.num_rows)
+                total_rows += group_df.height
+        finally:
+            if writer is not None:
+                writer.close()
 
-        # 최종 파일 저장
-        df.write_parquet(output_file, compression="snappy")
+        os.replace(tmp_file, output_file)
 
         logger.info(f"✅ 최종 파일 저장 완료: {output_file}")
-        logger.info(f"📊 총 행 수: {len(df)}")
+        logger.info(f"📊 총 행 수: {total_rows} (row group {len(groups)}개, 에피소드 경계 정렬)")
 
-        return df
+        return output_file
 
     except Exception as e:
         logger.error(f"❌ 파일 합치기 실패: {e}")
@@ -205,19 +716,113 @@ if __name__ == "__main__":
     parser.add_argument(
         "--sample-size", type=int, help="샘플링할 데이터 크기 (테스트용)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="이미지 인코딩 워커 프로세스 수 (기본: CPU 코어 수)",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        help="배치 파일 하나에 들어갈 원본 행 수",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="워커 작업 단위이자 row group 크기",
+    )
     parser.add_argument(
         "--merge-only", action="store_true", help="기존 배치 파일들만 합치기"
     )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="기존 배치 파일과 변환 매니페스트를 지우고 처음부터 변환",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="변환 매니페스트 기준으로 배치 파일 구성만 검증",
+    )
+    parser.add_argument(
+        "--migrate",
+        "--migrate-v2",
+        dest="migrate",
+        action="store_true",
+        help="기존 배치 파일들을 현재 스키마(JPEG 바이너리 + float32 배열)로 변환",
+    )
+    parser.add_argument(
+        "--add-hashes",
+        action="store_true",
+        help="기존 배치 파일에 정지 구간 묶기(dedup)용 카메라별 dHash 컬럼 추가",
+    )
+    parser.add_argument(
+        "--quality-ladder",
+        nargs="?",
+        const=",".join(str(size) for size in DEFAULT_QUALITY_LADDER),
+        default="",
+        help="원본보다 작은 이미지 변형 크기 목록, 예: 128,256 (값 없이 주면 128,256)",
+    )
+    parser.add_argument(
+        "--no-passthrough",
+        dest="passthrough",
+        action="store_false",
+        help="원본이 이미 조건에 맞는 JPEG여도 항상 디코딩 후 다시 인코딩",
+    )
+    parser.add_argument(
+        "--sprite-step",
+        type=int,
+        default=SPRITE_FRAME_STEP,
+        help="스프라이트 시트에 넣을 프레임 간격 (N프레임마다 한 장)",
+    )
+    parser.add_argument(
+        "--export-ipc",
+        action="store_true",
+        help="멀티 워커 서빙(LIBERO_LOAD_MODE=mmap)용 Arrow IPC 스냅샷도 생성",
+    )
+    parser.add_argument(
+        "--export-packs",
+        action="store_true",
+        help="프레임 이미지를 Range 요청으로 바로 서빙할 에피소드별 JPEG 팩도 생성",
+    )
 
     args = parser.parse_args()
 
-    if args.merge_only:
+    if args.verify:
+        sys.exit(0 if verify_conversion(args.output_dir) else 1)
+    elif args.migrate:
+        migrate_schema(args.output_dir)
+    elif args.add_hashes:
+        add_frame_hashes(args.output_dir)
+    elif args.merge_only:
         merge_parquet_files(args.output_dir)
     else:
         # 변환 실행
-        convert_libero_to_parquet(args.output_dir, args.sample_size)
+        convert_libero_to_parquet(
+            args.output_dir,
+            args.sample_size,
+            workers=args.workers,
+            shard_size=args.shard_size,
+            chunk_size=args.chunk_size,
+            restart=args.restart,
+            quality_ladder=[int(size) for size in args.quality_ladder.split(",") if size],
+            passthrough=args.passthrough,
+        )
 
         # 자동으로 합치기
         merge_parquet_files(args.output_dir)
 
+    # 백엔드가 바로 사용할 에피소드 오프셋 인덱스와 데이터셋 매니페스트 저장
+    save_episode_index(args.output_dir)
+    save_dataset_manifest(args.output_dir)
+    # 에피소드 브라우저용 작은 썸네일과 타임라인 스크러빙용 스프라이트 시트
+    save_episode_previews(args.output_dir, frame_step=args.sprite_step, workers=args.workers)
+    if args.export_ipc:
+        export_ipc_snapshot(args.output_dir)
+    if args.export_packs:
+        export_jpeg_packs(args.output_dir)
+
     logger.info("🎉 모든 작업 완료!")
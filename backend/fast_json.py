@@ -0,0 +1,58 @@
+"""
+빠른 JSON 직렬화 (orjson이 있으면 사용, 없으면 표준 json) 및 응답 클래스
+"""
+
+import json
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 동작
+    orjson = None
+
+
+def dumps_json(content):
+    """객체를 JSON 바이트로 직렬화 (numpy 스칼라/배열 포함)"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_numpy_default
+    ).encode("utf-8")
+
+
+def _numpy_default(value):
+    """표준 json용 numpy 값 변환"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def join_json_array(encoded_items):
+    """미리 직렬화된 JSON 값들을 다시 파싱하지 않고 배열 하나로 이어 붙임"""
+    return b"[" + b",".join(encoded_items) + b"]"
+
+
+def json_object_with_raw(raw_fields, fields):
+    """미리 직렬화된 값(raw_fields)과 일반 값(fields)을 합쳐 JSON 객체 바이트 생성"""
+    parts = [
+        dumps_json(key) + b":" + raw for key, raw in raw_fields.items()
+    ] + [dumps_json(key) + b":" + dumps_json(value) for key, value in fields.items()]
+    return b"{" + b",".join(parts) + b"}"
+
+
+def with_raw_fields(encoded_object, fields):
+    """직렬화된 JSON 객체 바이트에 다시 파싱하지 않고 필드를 덧붙임 (빈 객체가 아니어야 함)"""
+    extra = b",".join(dumps_json(key) + b":" + dumps_json(value) for key, value in fields.items())
+    return encoded_object[:-1] + b"," + extra + b"}"
+
+
+class FastJSONResponse(Response):
+    """jsonable_encoder를 거치지 않는 JSON 응답 (bytes는 이미 직렬화된 본문으로 그대로 전송)"""
+
+    media_type = "application/json"
+
+    def render(self, content):
+        if isinstance(content, bytes):
+            return content
+        return dumps_json(content)
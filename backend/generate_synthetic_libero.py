@@ -0,0 +1,438 @@
+"""
+오프라인 벤치마크/부하 테스트용 Libero 형태 합성 데이터셋 생성 스크립트
+
+convert_to_polars.py와 같은 스키마(v3: JPEG 바이너리 + float32 state/actions 배열)의
+libero_batch_*.parquet과 사이드카 파일들을 만든다. 이미지는 질감 있는 노이즈 장면 위에
+부드러운 엔드이펙터 궤적을 따라 움직이는 팔/물체를 그려, 실제 데이터와 비슷한
+JPEG 크기와 인코딩 비용을 갖도록 한다. 네트워크나 HuggingFace 데이터셋이 필요 없다.
+"""
+
+import os
+import sys
+import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+from tqdm import tqdm
+
+from libero_data import (
+    list_parquet_files,
+    save_episode_index,
+    save_dataset_manifest,
+    save_episode_previews,
+    export_ipc_snapshot,
+    export_jpeg_packs,
+    SPRITE_FRAME_STEP,
+    IMAGE_MAX_SIZES,
+    IMAGE_QUALITIES,
+    LADDER_QUALITIES,
+    DEFAULT_QUALITY_LADDER,
+    ladder_column,
+)
+from convert_to_polars import (
+    CONVERSION_MANIFEST_FILE,
+    DEFAULT_SHARD_SIZE,
+    ShardWriter,
+    frames_to_dataframe,
+    image_to_jpeg_optimized,
+    merge_parquet_files,
+    save_conversion_manifest,
+    verify_conversion,
+)
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+# 기본 규모는 실제 Libero 데이터셋과 같게 (1,693개 에피소드, 40개 태스크, 평균 약 161프레임)
+DEFAULT_EPISODES = 1693
+DEFAULT_TASKS = 40
+DEFAULT_MIN_FRAMES = 75
+DEFAULT_MAX_FRAMES = 250
+DEFAULT_IMAGE_SIZE = 256  # 원본 Libero 카메라 해상도
+FPS = 10
+
+# 엔드이펙터 작업 공간 (m)
+WORKSPACE_LOW = np.array([-0.3, -0.3, 0.85])
+WORKSPACE_HIGH = np.array([0.3, 0.3, 1.25])
+GRIPPER_OPEN = 0.04  # 손가락 하나의 열림 폭 (m)
+
+
+def smooth_noise(rng, size, cells, channels=3):
+    """저주파 값 노이즈 텍스처 (작은 랜덤 격자를 bicubic으로 확대)"""
+    grid = (rng.random((cells, cells, channels)) * 255).astype(np.uint8)
+    resized = Image.fromarray(grid).resize((size, size), Image.Resampling.BICUBIC)
+    return np.asarray(resized, dtype=np.float32)
+
+
+def scene_texture(rng, size):
+    """큰 색 얼룩 + 잔 질감 + 픽셀 노이즈를 섞은 장면 텍스처"""
+    texture = smooth_noise(rng, size, 6) * 0.6 + smooth_noise(rng, size, 32) * 0.4
+    texture += rng.normal(0, 10, (size, size, 1)).astype(np.float32)
+    return texture
+
+
+def ease(t):
+    """0~1 구간을 부드럽게 가감속하는 코사인 보간 가중치"""
+    return (1 - np.cos(np.pi * np.clip(t, 0, 1))) / 2
+
+
+def episode_trajectory(rng, frame_count):
+    """웨이포인트를 코사인 보간한 엔드이펙터 궤적으로 (state, actions, 그리퍼 닫힘 여부) 생성
+
+    state: [x, y, z, 축-각 회전 3개, 그리퍼 손가락 2개], actions: [Δ위치 3개, Δ회전 3개, 그리퍼(-1 열기/1 닫기)]
+    """
+    waypoint_count = int(rng.integers(3, 6))
+    waypoints = rng.uniform(WORKSPACE_LOW, WORKSPACE_HIGH, (waypoint_count, 3))
+    t = np.linspace(0, waypoint_count - 1, frame_count)
+    segment = np.minimum(t.astype(int), waypoint_count - 2)
+    weight = ease(t - segment)[:, None]
+    positions = waypoints[segment] * (1 - weight) + waypoints[segment + 1] * weight
+
+    # 아래를 향한 자세에서 천천히 흔들리는 회전
+    phase = rng.uniform(0, 2 * np.pi, 3)
+    time = np.arange(frame_count) / FPS
+    rotations = np.array([np.pi, 0.0, 0.0]) + 0.15 * np.sin(time[:, None] * 0.8 + phase)
+
+    # 에피소드 중간에 물체를 잡았다가 끝나기 전에 놓음 (5프레임에 걸쳐 닫힘)
+    grasp = int(frame_count * rng.uniform(0.25, 0.45))
+    release = int(frame_count * rng.uniform(0.75, 0.9))
+    frames = np.arange(frame_count)
+    closing = np.clip((frames - grasp) / 5, 0, 1) * np.clip((release - frames) / 5, 0, 1)
+    finger = GRIPPER_OPEN * (1 - closing)
+    state = np.column_stack([positions, rotations, finger, -finger])
+
+    deltas = np.diff(np.vstack([state[:1, :6], state[:, :6]]), axis=0)
+    gripper_action = np.where((frames >= grasp) & (frames < release), 1.0, -1.0)
+    actions = np.column_stack([np.clip(deltas * 20, -1, 1), gripper_action])
+    return state.astype(np.float32), actions.astype(np.float32), closing > 0.5
+
+
+def render_episode_images(rng, state, grasped, size):
+    """에피소드 프레임마다 (메인 카메라, 손목 카메라) uint8 이미지를 생성"""
+    scene = scene_texture(rng, size)
+    # 손목 카메라는 더 큰 질감에서 엔드이펙터 위치에 따라 움직이는 창을 잘라냄
+    wrist_scene = scene_texture(rng, size * 2)
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32)
+    arm_color = np.array([200.0, 200.0, 210.0])
+    object_color = rng.uniform(40, 255, 3)
+
+    # 작업 공간 좌표 → 메인 카메라 픽셀 좌표
+    span = WORKSPACE_HIGH - WORKSPACE_LOW
+    pixels = (state[:, :2] - WORKSPACE_LOW[:2]) / span[:2] * (size * 0.7) + size * 0.15
+    radii = size * (0.05 + 0.05 * (state[:, 2] - WORKSPACE_LOW[2]) / span[2])
+    object_pixel = pixels[int(np.argmax(grasped))] if grasped.any() else pixels[0]
+
+    for frame, (cx, cy) in enumerate(pixels):
+        if grasped[frame]:
+            object_pixel = pixels[frame]
+
+        main = scene.copy()
+        ox, oy = object_pixel
+        cube = (np.abs(xx - ox) < size * 0.05) & (np.abs(yy - oy) < size * 0.05)
+        main[cube] = object_color
+        arm = (xx - cx) ** 2 + (yy - cy) ** 2 < radii[frame] ** 2
+        main[arm] = arm_color
+        main += rng.normal(0, 3, (size, size, 1))
+
+        offset_x = int((cx / size) * size * 0.8)
+        offset_y = int((cy / size) * size * 0.8)
+        wrist = wrist_scene[offset_y : offset_y + size, offset_x : offset_x + size].copy()
+        # 그리퍼 손가락 두 개 (열림 폭에 따라 간격이 바뀜)
+        gap = size * (0.08 + 2.5 * state[frame, 6])
+        fingers = (np.abs(np.abs(xx - size / 2) - gap) < size * 0.04) & (yy > size * 0.6)
+        wrist[fingers] = arm_color
+        if grasped[frame]:
+            wrist[(np.abs(xx - size / 2) < gap - size * 0.04) & (yy > size * 0.65)] = object_color
+        wrist += rng.normal(0, 3, (size, size, 1))
+
+        yield (
+            np.clip(main, 0, 255).astype(np.uint8),
+            np.clip(wrist, 0, 255).astype(np.uint8),
+        )
+
+
+def generate_episode(episode_index, task_index, seed, frame_range, image_size, quality_ladder=()):
+    """합성 에피소드 하나를 convert_to_polars.py와 같은 스키마의 DataFrame으로 생성 (워커에서 실행)
+
+    에피소드마다 (seed, episode_index)로 난수를 만들기 때문에 워커 수와 관계없이 결과가 같다.
+    """
+    rng = np.random.default_rng([seed, episode_index])
+    frame_count = int(rng.integers(frame_range[0], frame_range[1] + 1))
+    state, actions, grasped = episode_trajectory(rng, frame_count)
+
+    rows = []
+    for frame_index, (main_image, wrist_image) in enumerate(
+        render_episode_images(rng, state, grasped, image_size)
+    ):
+        images = {}
+        for column, source_image in (("main_image", main_image), ("wrist_image", wrist_image)):
+            images[column] = image_to_jpeg_optimized(
+                source_image, quality=IMAGE_QUALITIES[column], max_size=IMAGE_MAX_SIZES[column]
+            )
+            for size in quality_ladder:
+                if size < IMAGE_MAX_SIZES[column]:
+                    images[ladder_column(column, size)] = image_to_jpeg_optimized(
+                        source_image, quality=LADDER_QUALITIES.get(size, 70), max_size=size
+                    )
+
+        rows.append(
+            {
+                "episode_index": episode_index,
+                "frame_index": frame_index,
+                "task_index": task_index,
+                "timestamp": frame_index / FPS,
+                "main_image": images.pop("main_image"),
+                "wrist_image": images.pop("wrist_image"),
+                "state": state[frame_index].tolist(),
+                "actions": actions[frame_index].tolist(),
+                **images,
+            }
+        )
+
+    return frames_to_dataframe(rows)
+
+
+def iter_generated_episodes(tasks, workers):
+    """에피소드 생성 작업을 순서대로 결과를 내보내되 동시에 처리 중인 에피소드 수를 제한"""
+    if workers <= 1:
+        for task in tasks:
+            yield task, generate_episode(*task)
+        return
+
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append((task, executor.submit(generate_episode, *task)))
+            if len(pending) >= max_in_flight:
+                done_task, future = pending.popleft()
+                yield done_task, future.result()
+        while pending:
+            done_task, future = pending.popleft()
+            yield done_task, future.result()
+
+
+def is_synthetic_dataset(output_dir):
+    """디렉토리의 변환 매니페스트가 이 스크립트로 만든 합성 데이터셋인지 확인"""
+    path = os.path.join(output_dir, CONVERSION_MANIFEST_FILE)
+    if not os.path.exists(path):
+        return False
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("dataset") == "synthetic"
+
+
+def check_output_dir(output_dir, overwrite=False):
+    """출력 디렉토리를 준비하고 이전 배치 파일을 지움
+
+    합성 데이터가 아닌 배치 파일(예: 변환한 실제 데이터)이 있으면 overwrite=True가 아닌 한 거부한다.
+    """
+    existing_batches = list_parquet_files(output_dir)
+    if existing_batches and not overwrite and not is_synthetic_dataset(output_dir):
+        raise ValueError(
+            f"{output_dir}에 합성 데이터가 아닌 배치 파일 {len(existing_batches)}개가 있습니다. "
+            "다른 --output-dir을 지정하거나 --overwrite로 덮어쓰세요."
+        )
+
+    os.makedirs(output_dir, exist_ok=True)
+    for path in existing_batches:
+        os.remove(path)
+
+
+def generate_synthetic_dataset(
+    output_dir="data_synthetic",
+    episodes=DEFAULT_EPISODES,
+    tasks=DEFAULT_TASKS,
+    min_frames=DEFAULT_MIN_FRAMES,
+    max_frames=DEFAULT_MAX_FRAMES,
+    image_size=DEFAULT_IMAGE_SIZE,
+    seed=0,
+    workers=1,
+    shard_size=DEFAULT_SHARD_SIZE,
+    quality_ladder=(),
+    overwrite=False,
+):
+    """합성 Libero 데이터셋을 배치 Parquet 파일로 생성
+
+    태스크는 실제 데이터처럼 연속된 에피소드 묶음에 배정하고, 배치 파일은 에피소드 경계에서
+    shard_size 행을 넘으면 나눈다. 변환 매니페스트도 같은 형식으로 기록하므로 --verify로 검증할 수 있다.
+    기존 배치 파일은 이전에 합성 데이터로 만든 디렉토리이거나 overwrite=True일 때만 지운다.
+    """
+    if min_frames < 2 or max_frames < min_frames:
+        raise ValueError("프레임 수 범위가 올바르지 않습니다 (2 ≤ min-frames ≤ max-frames)")
+
+    check_output_dir(output_dir, overwrite)
+
+    logger.info(
+        f"🧪 합성 데이터셋 생성 시작: 에피소드 {episodes}개, 태스크 {tasks}개, "
+        f"프레임 {min_frames}-{max_frames}, 이미지 {image_size}px (워커 {workers}개)"
+    )
+
+    manifest = {
+        "dataset": "synthetic",
+        "synthetic": {
+            "episodes": episodes,
+            "tasks": tasks,
+            "min_frames": min_frames,
+            "max_frames": max_frames,
+            "image_size": image_size,
+            "seed": seed,
+        },
+        "sample_size": None,
+        "shard_size": shard_size,
+        "quality_ladder": sorted(quality_ladder) or None,
+        "shards": {},
+    }
+    episode_tasks = [
+        (
+            episode_index,
+            episode_index * tasks // episodes,
+            seed,
+            (min_frames, max_frames),
+            image_size,
+            tuple(quality_ladder),
+        )
+        for episode_index in range(episodes)
+    ]
+
+    shard_writer = None
+    shard_start = 0
+    total_rows = 0
+
+    def commit_shard():
+        manifest["shards"][str(len(manifest["shards"]))] = {
+            "file": shard_writer.commit(),
+            "source_start": shard_start,
+            "source_end": total_rows,
+            "first_source_index": shard_start,
+            "last_source_index": total_rows - 1,
+            "rows": shard_writer.rows,
+            "skipped": [],
+            "completed_at": datetime.now().isoformat(),
+        }
+        logger.info(f"✅ 배치 {len(manifest['shards']) - 1} 저장 완료 ({shard_writer.rows}행)")
+
+    try:
+        for _, episode_df in tqdm(
+            iter_generated_episodes(episode_tasks, workers), total=episodes, desc="생성 중"
+        ):
+            if shard_writer is None:
+                shard_writer = ShardWriter(output_dir, len(manifest["shards"]))
+                shard_start = total_rows
+            shard_writer.write(episode_df, [])
+            total_rows += episode_df.height
+            if shard_writer.rows >= shard_size:
+                commit_shard()
+                shard_writer = None
+
+        if shard_writer is not None:
+            commit_shard()
+            shard_writer = None
+    finally:
+        if shard_writer is not None:
+            shard_writer.abort()
+
+    manifest["source_rows"] = manifest["source_count"] = total_rows
+    save_conversion_manifest(output_dir, manifest)
+    logger.info(f"✅ 합성 데이터 생성 완료: {total_rows}행")
+
+    if not verify_conversion(output_dir):
+        raise RuntimeError("배치 파일 검증에 실패했습니다")
+    return total_rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="오프라인 벤치마크용 Libero 형태 합성 데이터셋 생성 (convert_to_polars.py와 같은 스키마)"
+    )
+    parser.add_argument("--output-dir", default="data_synthetic", help="출력 디렉토리")
+    parser.add_argument("--episodes", type=int, default=DEFAULT_EPISODES, help="에피소드 수")
+    parser.add_argument("--tasks", type=int, default=DEFAULT_TASKS, help="태스크 수")
+    parser.add_argument(
+        "--min-frames", type=int, default=DEFAULT_MIN_FRAMES, help="에피소드당 최소 프레임 수"
+    )
+    parser.add_argument(
+        "--max-frames", type=int, default=DEFAULT_MAX_FRAMES, help="에피소드당 최대 프레임 수"
+    )
+    parser.add_argument(
+        "--image-size", type=int, default=DEFAULT_IMAGE_SIZE, help="원본 카메라 이미지 크기(px)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드 (같은 시드면 같은 데이터)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="이미지 생성/인코딩 워커 프로세스 수 (기본: CPU 코어 수)",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        help="배치 파일 하나에 들어갈 대략적인 행 수 (에피소드 경계에서 나눔)",
+    )
+    parser.add_argument(
+        "--quality-ladder",
+        nargs="?",
+        const=",".join(str(size) for size in DEFAULT_QUALITY_LADDER),
+        default="",
+        help="원본보다 작은 이미지 변형 크기 목록, 예: 128,256 (값 없이 주면 128,256)",
+    )
+    parser.add_argument(
+        "--sprite-step",
+        type=int,
+        default=SPRITE_FRAME_STEP,
+        help="스프라이트 시트에 넣을 프레임 간격 (N프레임마다 한 장)",
+    )
+    parser.add_argument(
+        "--export-ipc",
+        action="store_true",
+        help="멀티 워커 서빙(LIBERO_LOAD_MODE=mmap)용 Arrow IPC 스냅샷도 생성",
+    )
+    parser.add_argument(
+        "--export-packs",
+        action="store_true",
+        help="프레임 이미지를 Range 요청으로 바로 서빙할 에피소드별 JPEG 팩도 생성",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="합성 데이터가 아닌 기존 배치 파일(libero_batch_*.parquet)도 지우고 생성",
+    )
+
+    args = parser.parse_args()
+
+    generate_synthetic_dataset(
+        args.output_dir,
+        episodes=args.episodes,
+        tasks=args.tasks,
+        min_frames=args.min_frames,
+        max_frames=args.max_frames,
+        image_size=args.image_size,
+        seed=args.seed,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        quality_ladder=[int(size) for size in args.quality_ladder.split(",") if size],
+        overwrite=args.overwrite,
+    )
+
+    # 변환 스크립트와 같은 후처리 (병합 파일, 에피소드 인덱스, 매니페스트, 미리보기)
+    merge_parquet_files(args.output_dir)
+    save_episode_index(args.output_dir)
+    save_dataset_manifest(args.output_dir)
+    save_episode_previews(args.output_dir, frame_step=args.sprite_step, workers=args.workers)
+    if args.export_ipc:
+        export_ipc_snapshot(args.output_dir)
+    if args.export_packs:
+        export_jpeg_packs(args.output_dir)
+
+    logger.info("🎉 모든 작업 완료!")
@@ -0,0 +1,667 @@
+"""
+Libero Parquet 데이터 레이아웃 공용 유틸리티 (백엔드 서버 / 변환 스크립트 공용)
+"""
+
+import io
+import os
+import json
+import logging
+import hashlib
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# 에피소드 오프셋 인덱스 사이드카 파일
+EPISODE_INDEX_FILE = "episode_index.parquet"
+# 태스크/에피소드 통계, 합계, 콘텐츠 해시
+DATASET_MANIFEST_FILE = "dataset_manifest.json"
+# 멀티 워커 서빙용 Arrow IPC(Feather) 스냅샷: 에피소드 순 정렬, 비압축이라 메모리 매핑 가능
+IPC_SNAPSHOT_FILE = "libero_frames.arrow"
+# 에피소드별 작은 썸네일 + 타임라인 스크러빙용 필름스트립 스프라이트 시트
+EPISODE_PREVIEW_FILE = "episode_previews.parquet"
+# 에피소드/이미지 컬럼별 JPEG 팩(프레임 JPEG를 이어 붙인 파일) + 오프셋 인덱스(uint64, 프레임 수 + 1개)
+JPEG_PACK_DIR = "jpeg_packs"
+PACK_MANIFEST_FILE = "pack_manifest.json"
+PACK_INDEX_DTYPE = "<u8"
+
+# 미리보기 설정
+PREVIEW_THUMBNAIL_SIZE = 128  # 썸네일 최대 변 길이(px)
+SPRITE_FRAME_STEP = 10  # N프레임마다 한 장 (10fps 기준 1초)
+SPRITE_TILE_SIZE = 96  # 스프라이트 타일 최대 변 길이(px)
+SPRITE_COLUMNS = 10  # 스프라이트 시트 한 줄의 타일 수
+PREVIEW_BATCH_EPISODES = 20  # 미리보기 생성 시 한 번에 읽을 에피소드 수
+SNAPSHOT_BATCH_FRAMES = 2048  # IPC 스냅샷 생성 시 한 번에 읽을 프레임 수 (에피소드 단위로 묶음)
+
+# 스키마 버전
+#   v1 = 이미지 base64 문자열 + state/actions JSON 문자열
+#   v2 = 이미지 JPEG 바이너리(pl.Binary) + state/actions JSON 문자열
+#   v3 = 이미지 JPEG 바이너리 + state/actions 고정 길이 float32 배열(pl.Array)
+IMAGE_COLUMNS = ["main_image", "wrist_image"]
+STATE_DIM = 8
+ACTION_DIM = 7
+VECTOR_COLUMNS = {"state": STATE_DIM, "actions": ACTION_DIM}
+SCHEMA_VERSION = 3
+
+# 원본 이미지 컬럼의 최대 크기(px)와 JPEG 품질
+IMAGE_MAX_SIZES = {"main_image": 512, "wrist_image": 256}
+IMAGE_QUALITIES = {"main_image": 75, "wrist_image": 70}
+# 선택적 화질 단계: 변환 시 원본보다 작은 크기의 이미지 컬럼(예: main_image_128)을 함께 저장
+DEFAULT_QUALITY_LADDER = (128, 256)
+LADDER_QUALITIES = {128: 60, 256: 70}  # 단계 크기 → JPEG 품질 (없으면 70)
+# 프레임 지각 해시: 이미지 컬럼마다 64비트 dHash(UInt64) 컬럼, 정지 구간 프레임 묶기(dedup)용
+FRAME_HASH_GRID = 8  # 8x8 밝기 비교 = 64비트
+
+
+def list_parquet_files(data_path):
+    """Libero 배치 Parquet 파일 목록을 배치 번호 순으로 반환"""
+    if not os.path.isdir(data_path):
+        return []
+
+    def batch_sort_key(filename):
+        batch_id = filename[len("libero_batch_") : -len(".parquet")]
+        return (0, int(batch_id), "") if batch_id.isdigit() else (1, 0, batch_id)
+
+    filenames = [
+        f
+        for f in os.listdir(data_path)
+        if f.startswith("libero_batch_") and f.endswith(".parquet")
+    ]
+    return [os.path.join(data_path, f) for f in sorted(filenames, key=batch_sort_key)]
+
+
+def count_rows(parquet_files):
+    """파일별 행 수 반환"""
+    return [pl.scan_parquet(f).select(pl.len()).collect().item() for f in parquet_files]
+
+
+def dataset_version(parquet_files):
+    """파일 이름/크기/수정 시각으로 데이터셋 버전 해시 생성 (파일이 바뀌면 값이 바뀜)"""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in parquet_files:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def schema_version(schema):
+    """컬럼 타입으로 스키마 버전 판별"""
+    if schema.get("main_image") == pl.Utf8:
+        return 1
+    if schema.get("state") == pl.Utf8:
+        return 2
+    return 3
+
+
+def detect_schema_version(parquet_file):
+    """Parquet 파일의 스키마 버전 판별"""
+    return schema_version(pl.read_parquet_schema(parquet_file))
+
+
+def normalize_expressions(schema):
+    """파일 스키마를 현재 버전(v3) 타입으로 맞추는 컬럼 변환식 목록"""
+    expressions = [
+        pl.col(c).str.decode("base64")
+        for c in IMAGE_COLUMNS
+        if schema.get(c) == pl.Utf8
+    ]
+    for column, width in VECTOR_COLUMNS.items():
+        target = pl.Array(pl.Float32, width)
+        dtype = schema.get(column)
+        if dtype == pl.Utf8:
+            expressions.append(
+                pl.col(column).str.json_decode(pl.List(pl.Float64)).cast(target)
+            )
+        elif dtype is not None and dtype != target:
+            expressions.append(pl.col(column).cast(target))
+    return expressions
+
+
+def ladder_column(column, size):
+    """화질 단계 이미지 컬럼 이름"""
+    return f"{column}_{size}"
+
+
+def ladder_sizes(column, column_names):
+    """컬럼 이름 목록에 있는 이미지 컬럼의 화질 단계 크기 (작은 순, 원본보다 작은 것만)"""
+    prefix = f"{column}_"
+    return sorted(
+        int(name[len(prefix) :])
+        for name in column_names
+        if name.startswith(prefix)
+        and name[len(prefix) :].isdigit()
+        and int(name[len(prefix) :]) < IMAGE_MAX_SIZES[column]
+    )
+
+
+def image_variants(column_names):
+    """이미지 컬럼별 사용 가능한 변형: 원본 컬럼 → [(최대 크기, 컬럼)] (작은 순, 마지막이 원본)"""
+    return {
+        column: [(size, ladder_column(column, size)) for size in ladder_sizes(column, column_names)]
+        + [(max_size, column)]
+        for column, max_size in IMAGE_MAX_SIZES.items()
+    }
+
+
+def hash_column(column):
+    """이미지 컬럼의 dHash 컬럼 이름"""
+    return f"{column}_dhash"
+
+
+HASH_COLUMNS = [hash_column(column) for column in IMAGE_COLUMNS]
+
+
+def dhash_jpegs(jpeg_frames):
+    """JPEG 바이트 목록의 64비트 dHash를 uint64 배열로 계산
+
+    각 이미지를 (격자+1)x격자 흑백으로 줄이고(JPEG draft 모드로 축소 디코딩),
+    가로로 이웃한 픽셀 밝기 비교 결과를 벡터 연산으로 64비트씩 묶는다.
+    """
+    grid = FRAME_HASH_GRID
+    pixels = np.empty((len(jpeg_frames), grid, grid + 1), dtype=np.uint8)
+    for position, jpeg_bytes in enumerate(jpeg_frames):
+        img = Image.open(io.BytesIO(jpeg_bytes))
+        img.draft("L", ((grid + 1) * 4, grid * 4))
+        pixels[position] = np.asarray(
+            img.convert("L").resize((grid + 1, grid), Image.Resampling.BOX)
+        )
+    bits = (pixels[:, :, 1:] > pixels[:, :, :-1]).reshape(len(jpeg_frames), grid * grid)
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def with_frame_hashes(frames_df):
+    """프레임 DataFrame에 이미지 컬럼별 dHash 컬럼(UInt64)을 추가"""
+    return frames_df.with_columns(
+        [
+            pl.Series(hash_column(column), dhash_jpegs(frames_df[column].to_list()), dtype=pl.UInt64)
+            for column in IMAGE_COLUMNS
+        ]
+    )
+
+
+def scan_frames(parquet_files, schemas=None):
+    """버전이 다른 파일들을 함께 스캔하되 컬럼 타입은 항상 현재 스키마로 정규화
+
+    같은 스키마의 연속된 파일은 하나의 scan으로 묶으며 파일 순서(전역 행 오프셋)는 유지된다.
+    base64/JSON 디코딩은 실제로 읽힌 행에만 적용된다. 화질 단계 컬럼처럼 일부 파일에만 있는
+    컬럼은 제외하고 모든 파일에 공통인 컬럼만 노출한다.
+    """
+    if schemas is None:
+        schemas = [pl.read_parquet_schema(f) for f in parquet_files]
+    common_columns = [c for c in schemas[0] if all(c in schema for schema in schemas)]
+
+    scans = []
+    for _, group in itertools.groupby(
+        zip(parquet_files, schemas),
+        key=lambda item: (
+            [str(item[1].get(c)) for c in IMAGE_COLUMNS + list(VECTOR_COLUMNS)],
+            list(item[1]),
+        ),
+    ):
+        group = list(group)
+        scan = pl.scan_parquet([f for f, _ in group])
+        if list(group[0][1]) != common_columns:
+            scan = scan.select(common_columns)
+        expressions = normalize_expressions(group[0][1])
+        if expressions:
+            scan = scan.with_columns(expressions)
+        scans.append(scan)
+
+    return scans[0] if len(scans) == 1 else pl.concat(scans)
+
+
+def build_episode_index(frames):
+    """에피소드별 (start_row, length, task_index, 첫/마지막 타임스탬프) 인덱스 생성
+
+    frames는 파일 순서대로 이어 붙인 프레임 테이블(LazyFrame)이며, start_row는 그 안의
+    전역 행 오프셋이다. 에피소드 행이 연속이고 frame_index 순으로 정렬된 경우에만
+    contiguous가 True이며, 이때 에피소드 윈도우는 slice 한 번으로 읽을 수 있다.
+    """
+    return (
+        frames.select("episode_index", "frame_index", "task_index", "timestamp")
+        .with_row_index("row")
+        .group_by("episode_index")
+        .agg(
+            pl.min("row").cast(pl.Int64).alias("start_row"),
+            pl.len().cast(pl.Int64).alias("length"),
+            pl.first("task_index").alias("task_index"),
+            pl.min("timestamp").alias("start_timestamp"),
+            pl.max("timestamp").alias("end_timestamp"),
+            (
+                (pl.max("row") - pl.min("row") + 1 == pl.len())
+                & (pl.col("frame_index").diff().fill_null(1) > 0).all()
+            ).alias("contiguous"),
+        )
+        .sort("episode_index")
+        .collect()
+    )
+
+
+def save_episode_index(data_path):
+    """배치 파일들로부터 에피소드 인덱스를 만들어 사이드카 파일로 저장"""
+    parquet_files = list_parquet_files(data_path)
+    if not parquet_files:
+        logger.warning("⚠️  인덱스를 만들 Parquet 파일이 없습니다")
+        return None
+
+    index = build_episode_index(scan_frames(parquet_files))
+    output_path = os.path.join(data_path, EPISODE_INDEX_FILE)
+    index.write_parquet(output_path)
+    logger.info(f"✅ 에피소드 인덱스 저장 완료: {output_path} ({index.height}개 에피소드)")
+    return index
+
+
+def load_episode_index(data_path, parquet_files, total_rows=None):
+    """사이드카 인덱스가 최신이면 읽고, 아니면 로드 시점에 생성"""
+    sidecar_path = os.path.join(data_path, EPISODE_INDEX_FILE)
+    if os.path.exists(sidecar_path):
+        newest_batch = max(os.path.getmtime(f) for f in parquet_files)
+        if os.path.getmtime(sidecar_path) >= newest_batch:
+            index = pl.read_parquet(sidecar_path)
+            if total_rows is None or index["length"].sum() == total_rows:
+                logger.info(f"📇 에피소드 인덱스 사이드카 사용: {sidecar_path}")
+                return index
+        logger.info("📇 에피소드 인덱스 사이드카가 현재 파일과 맞지 않아 다시 생성합니다")
+
+    return build_episode_index(scan_frames(parquet_files))
+
+
+def update_parquet_digest(digest, path):
+    """Parquet 푸터의 행 그룹별 컬럼 통계(값 수, 비압축 크기, null 수, 최소/최대)를 해시에 추가
+
+    데이터 페이지를 읽지 않고 푸터만 읽으므로 큰 데이터셋에서도 빠르다. 압축 코덱에 따라
+    달라지는 압축 크기는 넣지 않는다.
+    """
+    metadata = pq.ParquetFile(path).metadata
+    digest.update(f"rows:{metadata.num_rows};".encode())
+    for group_number in range(metadata.num_row_groups):
+        row_group = metadata.row_group(group_number)
+        for column_number in range(row_group.num_columns):
+            column = row_group.column(column_number)
+            stats = column.statistics
+            parts = [column.path_in_schema, column.num_values, column.total_uncompressed_size]
+            if stats is not None:
+                parts.append(stats.null_count)
+                if stats.has_min_max:
+                    parts.extend([stats.min, stats.max])
+            digest.update((repr(parts) + ";").encode())
+
+
+def build_dataset_manifest(index, parquet_files):
+    """에피소드 인덱스로부터 태스크/에피소드 통계, 전체 합계, 콘텐츠 해시 계산
+
+    에피소드 인덱스만 사용하므로 프레임 테이블을 다시 집계하지 않는다.
+    """
+    episodes = index.select(
+        "episode_index",
+        "task_index",
+        pl.col("length").alias("frame_count"),
+        "start_timestamp",
+        "end_timestamp",
+        (pl.col("end_timestamp") - pl.col("start_timestamp")).alias("duration"),
+    ).sort("episode_index")
+    tasks = (
+        episodes.group_by("task_index")
+        .agg(
+            pl.len().alias("episode_count"),
+            pl.sum("frame_count").alias("frame_count"),
+            pl.min("frame_count").alias("min_episode_frames"),
+            pl.max("frame_count").alias("max_episode_frames"),
+            pl.sum("duration").alias("total_duration"),
+        )
+        .sort("task_index")
+    )
+
+    # 에피소드 통계 + 배치 파일 컬럼 통계가 같으면 같은 해시 (파일 이름/수정 시각과 무관)
+    digest = hashlib.sha256(episodes.write_csv().encode())
+    for path in parquet_files:
+        update_parquet_digest(digest, path)
+
+    return {
+        "dataset_version": dataset_version(parquet_files),
+        "total_frames": int(episodes["frame_count"].sum()),
+        "total_episodes": episodes.height,
+        "total_tasks": tasks.height,
+        "content_hash": digest.hexdigest(),
+        "tasks": tasks.to_dicts(),
+        "episodes": episodes.to_dicts(),
+    }
+
+
+def load_dataset_manifest(data_path, parquet_files, index):
+    """저장된 데이터셋 매니페스트가 현재 배치 파일과 같은 버전이면 읽고, 아니면 인덱스로 계산"""
+    manifest_path = os.path.join(data_path, DATASET_MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("dataset_version") == dataset_version(parquet_files):
+            logger.info(f"🧾 데이터셋 매니페스트 사용: {manifest_path}")
+            return manifest
+        logger.info("🧾 데이터셋 매니페스트가 현재 배치 파일과 맞지 않아 다시 계산합니다")
+
+    return build_dataset_manifest(index, parquet_files)
+
+
+def save_dataset_manifest(data_path):
+    """배치 파일들로부터 데이터셋 매니페스트를 만들어 JSON으로 저장"""
+    parquet_files = list_parquet_files(data_path)
+    if not parquet_files:
+        logger.warning("⚠️  매니페스트를 만들 Parquet 파일이 없습니다")
+        return None
+
+    manifest = build_dataset_manifest(
+        load_episode_index(data_path, parquet_files), parquet_files
+    )
+    output_path = os.path.join(data_path, DATASET_MANIFEST_FILE)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(
+        f"✅ 데이터셋 매니페스트 저장 완료: {output_path} "
+        f"({manifest['total_frames']}프레임, {manifest['total_episodes']}에피소드, {manifest['total_tasks']}태스크)"
+    )
+    return manifest
+
+
+def ipc_snapshot_path(data_path, parquet_files):
+    """Arrow IPC 스냅샷이 있고 모든 배치 파일보다 최신이면 경로, 아니면 None"""
+    snapshot_path = os.path.join(data_path, IPC_SNAPSHOT_FILE)
+    if not os.path.exists(snapshot_path):
+        return None
+    newest_batch = max(os.path.getmtime(f) for f in parquet_files)
+    return snapshot_path if os.path.getmtime(snapshot_path) >= newest_batch else None
+
+
+def open_ipc_snapshot(data_path):
+    """서버 워커용: 최신 스냅샷 경로를 반환하고, 없거나 오래됐으면 만들지 않고 오류
+
+    스냅샷 생성은 전체 프레임을 읽는 작업이므로 워커마다 하지 않고
+    start_backend.py --workers N 또는 변환 스크립트의 --export-ipc에서 한 번만 한다.
+    """
+    parquet_files = list_parquet_files(data_path)
+    snapshot_path = ipc_snapshot_path(data_path, parquet_files) if parquet_files else None
+    if snapshot_path is None:
+        raise FileNotFoundError(
+            f"Arrow IPC 스냅샷이 없거나 배치 파일보다 오래되었습니다: {os.path.join(data_path, IPC_SNAPSHOT_FILE)} "
+            "(start_backend.py --workers N 또는 convert_to_polars.py --export-ipc로 먼저 생성하세요)"
+        )
+    return snapshot_path
+
+
+def export_ipc_snapshot(data_path, force=False):
+    """배치 Parquet 파일들을 메모리 매핑용 Arrow IPC 스냅샷 하나로 변환하고 경로 반환
+
+    에피소드 순으로 SNAPSHOT_BATCH_FRAMES 행 안팎씩 읽어 레코드 배치로 이어 쓰므로 메모리에는
+    배치 하나 분량만 올라간다. 스냅샷이 모든 배치 파일보다 최신이면 다시 만들지 않는다.
+    임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완성된 파일만 본다.
+    """
+    parquet_files = list_parquet_files(data_path)
+    if not parquet_files:
+        logger.warning("⚠️  스냅샷을 만들 Parquet 파일이 없습니다")
+        return None
+
+    snapshot_path = os.path.join(data_path, IPC_SNAPSHOT_FILE)
+    if not force and ipc_snapshot_path(data_path, parquet_files) is not None:
+        return snapshot_path
+
+    logger.info(f"🗜️  Arrow IPC 스냅샷 생성 중: {snapshot_path}")
+    index = load_episode_index(data_path, parquet_files).sort("episode_index")
+    frames = scan_frames(parquet_files)
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    total_rows = 0
+    writer = None
+    try:
+        for batch_episodes in snapshot_batches(index):
+            batch = (
+                frames.filter(
+                    pl.col("episode_index").is_between(batch_episodes[0], batch_episodes[-1])
+                )
+                .sort(["episode_index", "frame_index"])
+                .collect()
+                .to_arrow()
+            )
+            if writer is None:
+                writer = pa.ipc.new_file(temp_path, batch.schema)
+            writer.write_table(batch)
+            total_rows += batch.num_rows
+        writer.close()
+        writer = None
+        os.replace(temp_path, snapshot_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    logger.info(
+        f"✅ Arrow IPC 스냅샷 저장 완료: {snapshot_path} "
+        f"({total_rows}행, {os.path.getsize(snapshot_path) / 1024 / 1024:.1f}MB)"
+    )
+    return snapshot_path
+
+
+def snapshot_batches(index):
+    """에피소드 순으로 묶은 (episode_index 목록) 배치를 생성 (배치당 약 SNAPSHOT_BATCH_FRAMES행)"""
+    batch, batch_rows = [], 0
+    for episode_index, length in index.select("episode_index", "length").iter_rows():
+        batch.append(episode_index)
+        batch_rows += length
+        if batch_rows >= SNAPSHOT_BATCH_FRAMES:
+            yield batch
+            batch, batch_rows = [], 0
+    if batch:
+        yield batch
+
+
+def resize_jpeg(jpeg_bytes, max_size, quality=80):
+    """JPEG 바이트를 최대 변 길이 max_size로 줄여 다시 인코딩"""
+    img = Image.open(io.BytesIO(jpeg_bytes))
+    img.draft("RGB", (max_size, max_size))  # JPEG 디코딩 단계에서 미리 축소
+    img = img.convert("RGB")
+    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def compose_sprite_sheet(
+    jpeg_frames, frames, tile_size=SPRITE_TILE_SIZE, columns=SPRITE_COLUMNS, quality=75
+):
+    """JPEG 프레임들을 격자 하나로 이어 붙인 스프라이트 시트와 프레임별 타일 오프셋 반환"""
+    tiles = []
+    for jpeg_bytes in jpeg_frames:
+        img = Image.open(io.BytesIO(jpeg_bytes))
+        img.draft("RGB", (tile_size, tile_size))
+        img = img.convert("RGB")
+        img.thumbnail((tile_size, tile_size), Image.Resampling.LANCZOS)
+        tiles.append(img)
+
+    tile_width, tile_height = tiles[0].size
+    columns = min(columns, len(tiles))
+    rows = -(-len(tiles) // columns)
+    sheet = Image.new("RGB", (tile_width * columns, tile_height * rows))
+    offsets = []
+    for position, (frame, tile) in enumerate(zip(frames, tiles)):
+        x = (position % columns) * tile_width
+        y = (position // columns) * tile_height
+        sheet.paste(tile, (x, y))
+        offsets.append({"frame": frame, "x": x, "y": y})
+
+    buffer = io.BytesIO()
+    sheet.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return {
+        "sprite": buffer.getvalue(),
+        "tile_width": tile_width,
+        "tile_height": tile_height,
+        "sprite_columns": columns,
+        "sprite_offsets": offsets,
+    }
+
+
+def build_episode_preview(episode_frames, frame_step=SPRITE_FRAME_STEP):
+    """한 에피소드의 샘플 프레임(frame_index 순, frame_step 간격)으로 썸네일 + 스프라이트 생성
+
+    episode_frames의 첫 행은 에피소드의 첫 프레임이어야 하며 썸네일로 사용된다.
+    """
+    images = episode_frames["main_image"].to_list()
+    return {
+        "episode_index": episode_frames["episode_index"][0],
+        "task_index": episode_frames["task_index"][0],
+        "thumbnail": resize_jpeg(images[0], PREVIEW_THUMBNAIL_SIZE),
+        "frame_step": frame_step,
+        **compose_sprite_sheet(
+            images, [position * frame_step for position in range(len(images))]
+        ),
+    }
+
+
+def save_episode_previews(data_path, frame_step=SPRITE_FRAME_STEP, workers=None):
+    """에피소드별 작은 썸네일과 스프라이트 시트를 만들어 사이드카 파일로 저장
+
+    에피소드 범위 단위로 필요한 프레임(N프레임마다 한 장)의 메인 이미지만 읽으므로
+    메모리 사용량은 배치 크기에 비례한다.
+    """
+    parquet_files = list_parquet_files(data_path)
+    if not parquet_files:
+        logger.warning("⚠️  미리보기를 만들 Parquet 파일이 없습니다")
+        return None
+
+    episode_indices = load_episode_index(data_path, parquet_files)["episode_index"].to_list()
+    frames = scan_frames(parquet_files).select(
+        "episode_index", "frame_index", "task_index", "main_image"
+    )
+
+    previews = []
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        for start in range(0, len(episode_indices), PREVIEW_BATCH_EPISODES):
+            batch_episodes = episode_indices[start : start + PREVIEW_BATCH_EPISODES]
+            sampled = (
+                frames.filter(
+                    pl.col("episode_index").is_between(batch_episodes[0], batch_episodes[-1])
+                )
+                .filter(
+                    (pl.col("frame_index").rank("ordinal").over("episode_index") - 1)
+                    % frame_step
+                    == 0
+                )
+                .sort(["episode_index", "frame_index"])
+                .collect()
+            )
+            previews.extend(
+                executor.map(
+                    functools.partial(build_episode_preview, frame_step=frame_step),
+                    sampled.partition_by("episode_index", maintain_order=True),
+                )
+            )
+
+    output_path = os.path.join(data_path, EPISODE_PREVIEW_FILE)
+    pl.DataFrame(previews).write_parquet(output_path)
+    logger.info(
+        f"✅ 에피소드 미리보기 저장 완료: {output_path} "
+        f"({len(previews)}개 에피소드, {os.path.getsize(output_path) / 1024 / 1024:.1f}MB)"
+    )
+    return output_path
+
+
+def load_episode_previews(data_path, parquet_files):
+    """미리보기 사이드카가 최신이면 읽고, 없거나 오래되었으면 None"""
+    sidecar_path = os.path.join(data_path, EPISODE_PREVIEW_FILE)
+    if not os.path.exists(sidecar_path):
+        return None
+    newest_batch = max(os.path.getmtime(f) for f in parquet_files)
+    if os.path.getmtime(sidecar_path) < newest_batch:
+        logger.info("🖼️  에피소드 미리보기 사이드카가 오래되어 사용하지 않습니다")
+        return None
+    logger.info(f"🖼️  에피소드 미리보기 사이드카 사용: {sidecar_path}")
+    return pl.read_parquet(sidecar_path)
+
+
+def jpeg_pack_paths(pack_dir, episode_index, column):
+    """에피소드/이미지 컬럼의 (JPEG 팩 경로, 오프셋 인덱스 경로)"""
+    base = os.path.join(pack_dir, f"episode_{episode_index:06d}.{column}")
+    return f"{base}.jpgpack", f"{base}.idx"
+
+
+def write_jpeg_pack(pack_path, index_path, jpeg_frames):
+    """프레임 JPEG들을 하나의 팩 파일로 이어 쓰고 시작 오프셋 인덱스 저장 (임시 파일에 쓴 뒤 교체)"""
+    offsets = np.zeros(len(jpeg_frames) + 1, dtype=PACK_INDEX_DTYPE)
+    np.cumsum([len(jpeg_bytes) for jpeg_bytes in jpeg_frames], out=offsets[1:])
+    with open(f"{pack_path}.tmp", "wb") as f:
+        f.write(b"".join(jpeg_frames))
+    offsets.tofile(f"{index_path}.tmp")
+    os.replace(f"{pack_path}.tmp", pack_path)
+    os.replace(f"{index_path}.tmp", index_path)
+
+
+def load_pack_manifest(data_path, parquet_files):
+    """JPEG 팩 매니페스트가 현재 배치 파일과 같은 버전이면 반환, 아니면 None"""
+    manifest_path = os.path.join(data_path, JPEG_PACK_DIR, PACK_MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("dataset_version") != dataset_version(parquet_files):
+        logger.info("📦 JPEG 팩이 현재 배치 파일과 맞지 않아 사용하지 않습니다")
+        return None
+    return manifest
+
+
+def export_jpeg_packs(data_path, force=False):
+    """에피소드별로 각 이미지 컬럼(화질 단계 포함)의 JPEG 팩과 오프셋 인덱스를 생성
+
+    팩 안의 프레임은 frame_index 순이므로 i번째 프레임은 offsets[i]:offsets[i+1] 바이트이다.
+    매니페스트는 모든 팩을 쓴 뒤 마지막에 기록하며, 배치 파일 버전이 같으면 다시 만들지 않는다.
+    """
+    parquet_files = list_parquet_files(data_path)
+    if not parquet_files:
+        logger.warning("⚠️  JPEG 팩을 만들 Parquet 파일이 없습니다")
+        return None
+
+    pack_dir = os.path.join(data_path, JPEG_PACK_DIR)
+    if not force and load_pack_manifest(data_path, parquet_files) is not None:
+        return pack_dir
+
+    frames = scan_frames(parquet_files)
+    columns = [
+        column
+        for variants in image_variants(frames.schema).values()
+        for _, column in variants
+    ]
+    episode_indices = load_episode_index(data_path, parquet_files)["episode_index"].to_list()
+    os.makedirs(pack_dir, exist_ok=True)
+
+    logger.info(f"📦 JPEG 팩 생성 중: {pack_dir} (컬럼: {', '.join(columns)})")
+    total_bytes = 0
+    for start in range(0, len(episode_indices), PREVIEW_BATCH_EPISODES):
+        batch_episodes = episode_indices[start : start + PREVIEW_BATCH_EPISODES]
+        batch = (
+            frames.select("episode_index", "frame_index", *columns)
+            .filter(pl.col("episode_index").is_between(batch_episodes[0], batch_episodes[-1]))
+            .sort(["episode_index", "frame_index"])
+            .collect()
+        )
+        for episode_frames in batch.partition_by("episode_index", maintain_order=True):
+            episode_index = episode_frames["episode_index"][0]
+            for column in columns:
+                jpeg_frames = episode_frames[column].to_list()
+                write_jpeg_pack(*jpeg_pack_paths(pack_dir, episode_index, column), jpeg_frames)
+                total_bytes += sum(len(jpeg_bytes) for jpeg_bytes in jpeg_frames)
+
+    manifest = {
+        "dataset_version": dataset_version(parquet_files),
+        "columns": columns,
+        "total_episodes": len(episode_indices),
+        "index_dtype": PACK_INDEX_DTYPE,
+    }
+    with open(os.path.join(pack_dir, PACK_MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(
+        f"✅ JPEG 팩 저장 완료: {pack_dir} "
+        f"({len(episode_indices)}개 에피소드 × {len(columns)}개 컬럼, {total_bytes / 1024 / 1024:.1f}MB)"
+    )
+    return pack_dir
@@ -1,6 +1,16 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Request
+from fastapi import (
+    FastAPI,
+    HTTPException,
+    UploadFile,
+    File,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import polars as pl
@@ -15,7 +25,57 @@ import logging
 import sys
 import traceback
 import time
+import asyncio
+import bisect
+import math
+import functools
+import itertools
+import mmap
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+
+from cache import LRUCache, estimate_size
+from fast_json import (
+    FastJSONResponse,
+    dumps_json,
+    join_json_array,
+    json_object_with_raw,
+    with_raw_fields,
+)
+
+from search import build_search_frames, parse_search_query, search_episode_ranges
+
+from libero_data import (
+    IMAGE_COLUMNS,
+    list_parquet_files,
+    count_rows,
+    SCHEMA_VERSION,
+    dataset_version,
+    schema_version,
+    scan_frames,
+    build_episode_index,
+    load_episode_index,
+    load_dataset_manifest,
+    open_ipc_snapshot,
+    load_episode_previews,
+    build_episode_preview,
+    compose_sprite_sheet,
+    resize_jpeg,
+    PREVIEW_THUMBNAIL_SIZE,
+    SPRITE_FRAME_STEP,
+    DEFAULT_QUALITY_LADDER,
+    IMAGE_MAX_SIZES,
+    image_variants,
+    ladder_column,
+    load_pack_manifest,
+    jpeg_pack_paths,
+    JPEG_PACK_DIR,
+    PACK_INDEX_DTYPE,
+    HASH_COLUMNS,
+)
 
 # 로깅 설정 개선
 logging.basicConfig(
@@ -42,6 +102,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 에피소드 목록 페이지네이션 헤더를 브라우저에서 읽을 수 있도록 노출
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 
@@ -82,7 +144,13 @@ async def log_requests(request: Request, call_next):
 @app.on_event("startup")
 async def startup_event():
     """애플리케이션 시작 시 초기화"""
-    global libero_df, libero_dataset, dataset_load_error
+    global libero_df, libero_dataset, dataset_load_error, image_variant_table, frame_hash_columns
+    global blocking_executor
+
+    # 종료 시 풀을 닫으므로 시작할 때마다 새로 생성 (같은 프로세스에서 앱을 다시 시작해도 동작)
+    blocking_executor = ThreadPoolExecutor(
+        max_workers=BLOCKING_WORKERS, thread_name_prefix="libero-blocking"
+    )
 
     logger.info("🚀 로봇 행동 태깅 API 서버 시작")
     logger.info("=" * 40)
@@ -90,25 +158,67 @@ async def startup_event():
 
     # 실제 형식을 맞춘 향상된 더미 데이터 생성
     try:
-        data_path = "./data"
-        parquet_files = [os.path.join(data_path, f) for f in os.listdir(data_path) if f.startswith("libero_batch_") and f.endswith(".parquet")]
+        parquet_files = list_parquet_files(DATA_PATH)
 
         if parquet_files:
-            logger.info(f"💾 {len(parquet_files)}개의 Parquet 파일 로딩 중...")
-            # scan_parquet을 사용하여 메모리 효율적으로 여러 파일 처리
-            libero_df = pl.scan_parquet(parquet_files).collect()
-            logger.info("✅ Parquet 파일 로딩 완료!")
-            logger.info(f"📊 로드된 데이터프레임 정보: {libero_df.shape}")
-            logger.info(f"첫 5개 행:\n{libero_df.head()}")
-            
+            logger.info(f"💾 {len(parquet_files)}개의 Parquet 파일 로딩 중... (모드: {LIBERO_LOAD_MODE})")
+            schemas = [pl.read_parquet_schema(f) for f in parquet_files]
+            legacy_count = sum(schema_version(sc) < SCHEMA_VERSION for sc in schemas)
+            if legacy_count:
+                logger.info(
+                    f"🗂️  이전 스키마 파일 {legacy_count}개는 로드 시 v{SCHEMA_VERSION} 타입으로 변환됩니다"
+                )
+
+            if LIBERO_LOAD_MODE == "memory":
+                # 전체 프레임 테이블을 메모리에 적재 (이미지는 바이너리, state/actions는 float32 배열)
+                libero_df = scan_frames(parquet_files, schemas).collect()
+                logger.info("✅ Parquet 파일 로딩 완료!")
+                logger.info(f"📊 로드된 데이터프레임 정보: {libero_df.shape}")
+                logger.info(f"첫 5개 행:\n{libero_df.head()}")
+            elif LIBERO_LOAD_MODE == "mmap":
+                # 비압축 Arrow IPC 스냅샷을 메모리 매핑 (워커들이 같은 페이지 캐시를 공유)
+                # 스냅샷은 start_backend.py / --export-ipc가 미리 만들어 두며 워커는 열기만 함
+                libero_df = pl.read_ipc(open_ipc_snapshot(DATA_PATH), memory_map=True)
+                logger.info("✅ Arrow IPC 스냅샷 메모리 매핑 완료")
+                logger.info(f"📊 로드된 데이터프레임 정보: {libero_df.shape}")
+            else:
+                # LazyFrame으로 유지하고 요청마다 필요한 행/컬럼만 읽음 (predicate/projection pushdown)
+                libero_df = scan_frames(parquet_files, schemas)
+                logger.info("✅ Parquet 파일 스캔 준비 완료 (지연 로딩)")
+                logger.info(f"📊 스키마: {libero_df.schema}")
+
+            load_episode_lookup(parquet_files, schemas)
+            image_variant_table = image_variants(libero_df.schema)
+            logger.info(
+                "🪜 이미지 화질 단계: "
+                + ", ".join(
+                    f"{column} {[size for size, _ in variants]}"
+                    for column, variants in image_variant_table.items()
+                )
+            )
+            # 모든 배치 파일에 dHash 컬럼이 있을 때만 dedup= 지원
+            frame_hash_columns = (
+                tuple(HASH_COLUMNS)
+                if all(column in libero_df.schema for column in HASH_COLUMNS)
+                else ()
+            )
+            if not frame_hash_columns:
+                logger.info("🧬 프레임 해시 컬럼이 없어 dedup= 요청은 지원하지 않습니다")
+
             libero_dataset = "polars_dataframe"
             dataset_load_error = None
         else:
             logger.warning("⚠️ Parquet 파일을 찾을 수 없습니다. 더미 데이터 모드로 전환합니다.")
             libero_dataset = "enhanced_dummy" # 더미 데이터 플래그
             libero_df = None
+            frame_hash_columns = ()
             dataset_load_error = "No parquet files found in backend/data"
-            
+            set_episode_listing(dummy_episode_list())
+            # 더미 모드는 이미지를 요청 시 만들므로 모든 화질 단계를 지원
+            image_variant_table = image_variants(
+                [ladder_column(c, size) for c in IMAGE_MAX_SIZES for size in DEFAULT_QUALITY_LADDER]
+            )
+
     except Exception as e:
         logger.error(f"❌ 데이터셋 로딩 실패: {e}")
         logger.error(f"스택트레이스:\n{traceback.format_exc()}")
@@ -120,6 +230,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """애플리케이션 종료 시 정리"""
+    blocking_executor.shutdown(wait=False, cancel_futures=True)
     logger.info("👋 서버가 종료됩니다.")
 
 
@@ -201,6 +312,10 @@ class LiberoFrame(BaseModel):
     task_index: int
 
 
+class ThumbnailBatchRequest(BaseModel):
+    episode_indices: List[int]
+
+
 class LiberoEpisode(BaseModel):
     frames: List[LiberoFrame]
     episode_index: int
@@ -215,9 +330,756 @@ tagging_data_storage = {}
 libero_df = None
 libero_dataset = None
 dataset_load_error = None
-# 캐시 추가
-episode_cache = {}
-thumbnail_cache = {}
+# 에피소드 오프셋 인덱스: episode_index → start_row, length, task_index, 타임스탬프
+episode_lookup = {}
+# 지연 모드용 (파일 경로, 전역 시작 행, 행 수, 파일 스키마)
+libero_sources = []
+# 로드된 Parquet 파일 기준 데이터셋 버전 (ETag 생성용)
+libero_dataset_version = "dummy"
+# 가장 최근 Parquet 파일 수정 시각 (Last-Modified용, 더미 모드에서는 서버 시작 시각)
+libero_last_modified = time.time()
+# 로드 시 에피소드 인덱스로 한 번 계산하는 데이터셋 매니페스트 (합계, 콘텐츠 해시)
+dataset_manifest = None
+# /tasks, /episodes 응답용으로 미리 만들어 둔 목록
+manifest_tasks = []
+manifest_episodes = []
+# 에피소드 목록 페이지네이션용: episode_index → 에피소드 통계,
+# (task_index 또는 None, 정렬 기준) → (정렬 키 목록, 정렬된 에피소드 목록)
+listing_episode_lookup = {}
+episode_orders = {}
+EPISODE_SORT_KEYS = ("episode_index", "frame_count", "duration")
+# 변환 시 만든 에피소드 미리보기 (작은 썸네일 + 스프라이트 시트): episode_index → 행
+episode_previews = {}
+
+# 이미지 컬럼별 화질 단계: 원본 컬럼 → [(최대 크기, 컬럼)] (작은 순, 마지막이 원본)
+image_variant_table = image_variants([])
+# quality= 파라미터 단계 → 요청 크기 (None이면 원본)
+QUALITY_TIERS = {"low": 128, "medium": 256, "high": None}
+DEFAULT_IMAGE_COLUMNS = ("main_image", "wrist_image")
+# 응답 프레임 레코드의 이미지 외 컬럼
+FRAME_FIELDS = ["state", "actions", "timestamp", "frame_index", "episode_index", "task_index"]
+# 궤적 검색용 프레임 테이블 (첫 검색 시 state/actions만 읽어 한 번 생성)
+search_frames = None
+search_frames_lock = threading.Lock()
+
+# 카메라별 dHash 컬럼 (변환 시 생성, 없으면 빈 튜플) 및 dedup= 임계값(해밍 거리) 상한
+frame_hash_columns = ()
+MAX_DEDUP_DISTANCE = 64
+
+# JPEG 팩이 있는 이미지 컬럼 (convert_to_polars.py --export-packs, 배치 파일 버전이 같을 때만 사용)
+jpeg_pack_columns = set()
+# 열어 둔 JPEG 팩: (episode_index, 컬럼) → (mmap, 오프셋 배열), 오래 안 쓴 것부터 닫음
+JPEG_PACK_OPEN_FILES = int(os.environ.get("LIBERO_PACK_OPEN_FILES", "256"))
+open_jpeg_packs = OrderedDict()
+open_jpeg_packs_lock = threading.Lock()
+
+# 썸네일 일괄 요청 한 번에 받을 수 있는 최대 에피소드 수
+MAX_THUMBNAIL_BATCH = 200
+# 프레임 이미지 엔드포인트용 카메라 → 컬럼 매핑
+FRAME_CAMERAS = {"main": "main_image", "wrist": "wrist_image"}
+# 데이터셋 버전이 ETag에 포함되므로 프레임 이미지는 변하지 않는 리소스로 취급
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# JSON 응답은 캐시하되 매번 ETag로 재검증 (파일이 바뀌면 새 응답)
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+# 캐시 추가 (바이트 예산 기반 LRU)
+EPISODE_CACHE_BYTES = int(os.environ.get("LIBERO_EPISODE_CACHE_MB", "512")) * 1024 * 1024
+THUMBNAIL_CACHE_BYTES = int(os.environ.get("LIBERO_THUMBNAIL_CACHE_MB", "64")) * 1024 * 1024
+# 에피소드 캐시는 (episode_index, 청크 번호) 단위로 저장하여 겹치는 프레임 윈도우 요청이 재사용
+EPISODE_CHUNK_FRAMES = int(os.environ.get("LIBERO_CACHE_CHUNK_FRAMES", "32"))
+episode_cache = LRUCache("episode", EPISODE_CACHE_BYTES)
+thumbnail_cache = LRUCache("thumbnail", THUMBNAIL_CACHE_BYTES)
+
+# Polars 쿼리, JPEG 인코딩, 파일 읽기/쓰기는 이벤트 루프 밖의 제한된 스레드 풀에서 실행
+BLOCKING_WORKERS = int(os.environ.get("LIBERO_BLOCKING_WORKERS", "8"))
+blocking_executor = None  # startup_event에서 생성, shutdown_event에서 종료
+
+# WebSocket 재생 설정: 기본 fps, 클라이언트별 전송 큐 크기(프레임 수, 가득 차면 오래된 프레임부터 버림)
+LIBERO_FPS = 10
+WS_SEND_QUEUE_FRAMES = int(os.environ.get("LIBERO_WS_QUEUE_FRAMES", "4"))
+WS_MIN_SPEED = 0.1
+WS_MAX_SPEED = 8.0
+
+# 데이터 로딩 설정
+DATA_PATH = os.environ.get("LIBERO_DATA_PATH", "./data")
+# "lazy": Parquet에서 직접 읽기 (메모리 사용량 일정), "memory": 전체를 메모리에 적재,
+# "mmap": Arrow IPC 스냅샷을 메모리 매핑 (uvicorn --workers N으로 띄울 때 워커 간 페이지 캐시 공유)
+LIBERO_LOAD_MODE = os.environ.get("LIBERO_LOAD_MODE", "lazy")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """블로킹 함수를 전용 스레드 풀에서 실행하고 결과를 기다림 (이벤트 루프는 다른 요청을 계속 처리)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        blocking_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def iterate_blocking(iterator):
+    """동기 이터레이터의 각 항목을 전용 스레드 풀에서 생성"""
+    done = object()
+    while True:
+        item = await run_blocking(next, iterator, done)
+        if item is done:
+            break
+        yield item
+
+
+def read_json_file(file_path):
+    """JSON 파일 읽기"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json_file(file_path, data):
+    """JSON 파일 쓰기 (디렉토리가 없으면 생성)"""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def libero_frames():
+    """프레임 테이블을 LazyFrame으로 반환 (메모리/지연 모드 공통 쿼리 진입점)"""
+    return libero_df.lazy()
+
+
+def load_episode_lookup(parquet_files, schemas):
+    """파일별 행 오프셋과 에피소드 오프셋 인덱스를 로드"""
+    global libero_df, libero_sources, episode_lookup, libero_dataset_version, libero_last_modified
+    global dataset_manifest, manifest_tasks, manifest_episodes
+    global episode_previews, jpeg_pack_columns
+
+    libero_dataset_version = dataset_version(parquet_files)
+    libero_last_modified = max(os.path.getmtime(f) for f in parquet_files)
+    file_rows = count_rows(parquet_files)
+    file_starts = [sum(file_rows[:i]) for i in range(len(file_rows))]
+    libero_sources = list(zip(parquet_files, file_starts, file_rows, schemas))
+
+    if LIBERO_LOAD_MODE == "mmap":
+        # 스냅샷은 에피소드 순으로 정렬되어 있어 Parquet 사이드카와 행 오프셋이 다름
+        index = build_episode_index(libero_df.lazy())
+    else:
+        index = load_episode_index(DATA_PATH, parquet_files, total_rows=sum(file_rows))
+
+    if isinstance(libero_df, pl.DataFrame) and not index["contiguous"].all():
+        # 메모리 모드에서는 한 번 정렬해두면 모든 에피소드를 slice로 읽을 수 있음
+        logger.info("🔃 에피소드 행이 연속적이지 않아 (episode_index, frame_index)로 정렬합니다")
+        libero_df = libero_df.sort(["episode_index", "frame_index"])
+        index = build_episode_index(libero_df.lazy())
+
+    episode_lookup = {row["episode_index"]: row for row in index.iter_rows(named=True)}
+
+    # 요청마다 프레임 테이블을 집계하지 않도록 응답 목록을 미리 구성
+    dataset_manifest = load_dataset_manifest(DATA_PATH, parquet_files, index)
+    manifest_tasks = [
+        {
+            **task,
+            "description": f"Task {task['task_index']}",  # Parquet에 설명이 없으므로 생성
+            "real_libero_task": True,
+        }
+        for task in dataset_manifest["tasks"]
+    ]
+    manifest_episodes = dataset_manifest["episodes"]
+    set_episode_listing(manifest_episodes)
+    logger.info(
+        f"🧾 데이터셋 매니페스트: {dataset_manifest['total_frames']}프레임, "
+        f"{dataset_manifest['total_episodes']}에피소드, {dataset_manifest['total_tasks']}태스크 "
+        f"(content_hash={dataset_manifest['content_hash'][:12]})"
+    )
+    previews = load_episode_previews(DATA_PATH, parquet_files)
+    if previews is None:
+        episode_previews = {}
+        logger.info("🖼️  미리보기 사이드카가 없어 썸네일/스프라이트는 요청 시 생성합니다")
+    else:
+        episode_previews = {row["episode_index"]: row for row in previews.iter_rows(named=True)}
+
+    pack_manifest = load_pack_manifest(DATA_PATH, parquet_files)
+    jpeg_pack_columns = set(pack_manifest["columns"]) if pack_manifest else set()
+    open_jpeg_packs.clear()
+    if jpeg_pack_columns:
+        logger.info(f"📦 JPEG 팩 사용: {', '.join(sorted(jpeg_pack_columns))}")
+
+    non_contiguous = index.height - index["contiguous"].sum()
+    logger.info(
+        f"📇 에피소드 인덱스 준비 완료: {index.height}개 에피소드"
+        + (f" (비연속 {non_contiguous}개는 필터 경로 사용)" if non_contiguous else "")
+    )
+
+
+def set_episode_listing(episodes):
+    """태스크별/정렬 기준별 에피소드 순서를 미리 정렬해 두어 목록 요청은 bisect + slice로 처리"""
+    global listing_episode_lookup, episode_orders
+
+    groups = {None: episodes}
+    for episode in episodes:
+        groups.setdefault(episode["task_index"], []).append(episode)
+
+    listing_episode_lookup = {episode["episode_index"]: episode for episode in episodes}
+    episode_orders = {}
+    for task_index, group in groups.items():
+        for sort_by in EPISODE_SORT_KEYS:
+            ordered = sorted(group, key=lambda e: (e[sort_by], e["episode_index"]))
+            keys = [(e[sort_by], e["episode_index"]) for e in ordered]
+            episode_orders[task_index, sort_by] = (keys, ordered)
+
+
+def page_episodes(task_index, sort_by, descending, after_episode, limit):
+    """keyset 페이지네이션: (정렬 키, episode_index)가 커서 에피소드 다음인 에피소드부터 limit개
+
+    (페이지, 다음 커서 또는 None, 전체 개수)를 반환한다.
+    """
+    keys, ordered = episode_orders.get((task_index, sort_by), ([], []))
+    cursor_key = None
+    if after_episode is not None:
+        cursor = listing_episode_lookup[after_episode]
+        cursor_key = (cursor[sort_by], after_episode)
+
+    limit = max(limit, 0)
+    if descending:
+        end = len(keys) if cursor_key is None else bisect.bisect_left(keys, cursor_key)
+        page = ordered[max(end - limit, 0) : end][::-1]
+        has_more = end - limit > 0
+    else:
+        start = 0 if cursor_key is None else bisect.bisect_right(keys, cursor_key)
+        page = ordered[start : start + limit]
+        has_more = start + limit < len(keys)
+
+    next_cursor = page[-1]["episode_index"] if page and has_more else None
+    return page, next_cursor, len(keys)
+
+
+def image_target_size(size=None, quality=None):
+    """size= / quality= 파라미터를 요청 이미지 크기로 변환 (None이면 원본)"""
+    if size is not None:
+        if size <= 0:
+            raise HTTPException(status_code=400, detail="size는 양수여야 합니다")
+        return size
+    if quality is None:
+        return None
+    if quality not in QUALITY_TIERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"quality는 {', '.join(QUALITY_TIERS)} 중 하나여야 합니다",
+        )
+    return QUALITY_TIERS[quality]
+
+
+def select_image_variant(column, target_size):
+    """요청 크기 이상인 가장 작은 화질 단계를 (컬럼, 최대 크기)로 선택 (없으면 원본)"""
+    variants = image_variant_table[column]
+    if target_size is not None:
+        for variant_size, variant_column in variants:
+            if variant_size >= target_size:
+                return variant_column, variant_size
+    return variants[-1][1], variants[-1][0]
+
+
+def select_image_columns(target_size):
+    """메인/손목 카메라 이미지 컬럼을 요청 크기에 맞게 선택"""
+    return tuple(select_image_variant(column, target_size)[0] for column in DEFAULT_IMAGE_COLUMNS)
+
+
+def image_column_size(column):
+    """이미지 컬럼의 최대 크기(px)"""
+    for variants in image_variant_table.values():
+        for variant_size, variant_column in variants:
+            if variant_column == column:
+                return variant_size
+    return None
+
+
+def read_frame_rows(start_row, length, columns=None):
+    """전역 행 오프셋 기준으로 연속된 프레임 행을 읽음 (zero-copy slice)"""
+    if isinstance(libero_df, pl.DataFrame):
+        window = libero_df.slice(start_row, length)
+        return window.select(columns) if columns else window
+
+    pieces = frame_row_scans(start_row, length, columns)
+    if not pieces:
+        return libero_frames().select(columns or pl.all()).head(0).collect()
+    return pl.concat(pieces).collect()
+
+
+def gather_frame_rows(rows, columns):
+    """여러 전역 행 오프셋의 프레임을 한 번의 쿼리로 읽음 (요청 순서 유지)"""
+    if isinstance(libero_df, pl.DataFrame):
+        return libero_df.select(pl.col(columns).gather(rows))
+
+    # 지연 모드: 행을 파일별로 묶어 파일마다 스캔 한 번(행 번호 is_in 필터)으로 읽고,
+    # 전체를 하나의 쿼리로 실행한 뒤 요청 순서로 다시 정렬
+    starts = [source[1] for source in libero_sources]
+    rows_by_source = {}
+    for row in rows:
+        position = bisect.bisect_right(starts, row) - 1
+        if position >= 0 and row < starts[position] + libero_sources[position][2]:
+            rows_by_source.setdefault(position, set()).add(row - starts[position])
+    if not rows_by_source:
+        return libero_frames().select(columns).head(0).collect()
+
+    pieces = []
+    for position, local_rows in sorted(rows_by_source.items()):
+        path, file_start, _, schema = libero_sources[position]
+        pieces.append(
+            scan_frames([path], [schema])
+            .select(columns)
+            .with_row_index("_row")
+            .filter(pl.col("_row").is_in(sorted(local_rows)))
+            .select((pl.col("_row").cast(pl.Int64) + file_start).alias("_row"), *columns)
+        )
+    frames = pl.concat(pieces).collect()
+    result_rows = {row: i for i, row in enumerate(frames["_row"].to_list())}
+    return frames.select(
+        pl.col(columns).gather([result_rows[row] for row in rows if row in result_rows])
+    )
+
+
+def frame_row_scans(start_row, length, columns=None):
+    """지연 모드: 행 범위를 포함하는 파일만 골라 파일별 slice LazyFrame 목록 반환"""
+    pieces = []
+    end_row = start_row + length
+    starts = [source[1] for source in libero_sources]
+    position = max(bisect.bisect_right(starts, start_row) - 1, 0)
+    for path, file_start, file_rows, schema in libero_sources[position:]:
+        if file_start >= end_row:
+            break
+        lo = max(start_row, file_start) - file_start
+        hi = min(end_row, file_start + file_rows) - file_start
+        if hi <= lo:
+            continue
+        source = scan_frames([path], [schema])
+        if columns:
+            source = source.select(columns)
+        pieces.append(source.slice(lo, hi - lo))
+    return pieces
+
+
+def frame_records(frames_df, image_columns=DEFAULT_IMAGE_COLUMNS):
+    """프레임 DataFrame을 API 응답용 레코드 목록으로 변환
+
+    이미지는 선택된 행만 벡터 연산으로 base64 인코딩하고, state/actions는 float32 배열
+    컬럼을 컬럼 단위로 리스트 변환하므로 행마다 JSON을 파싱하지 않는다.
+    image_columns는 응답의 image / wrist_image로 쓸 (메인, 손목) 화질 단계 컬럼이다.
+    """
+    main_column, wrist_column = image_columns
+    columns = frames_df.select(
+        pl.col(main_column).bin.encode("base64").alias("image"),
+        pl.col(wrist_column).bin.encode("base64").alias("wrist_image"),
+        *FRAME_FIELDS,
+    ).to_dict(as_series=False)
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def load_episode_frames(entry, start_frame, end_frame, image_columns=DEFAULT_IMAGE_COLUMNS):
+    """[start_frame, end_frame) 프레임을 JSON 바이트 목록으로 청크 캐시를 거쳐 반환
+
+    캐시에는 직렬화된 프레임을 화질 단계별로 저장하므로 캐시 히트 시 다시 직렬화하지 않는다.
+    """
+    # 에피소드 범위 밖(음수 청크, 다음 에피소드 행)은 읽지 않음
+    start_frame = max(start_frame, 0)
+    end_frame = min(end_frame, entry["length"])
+    if end_frame <= start_frame:
+        return []
+
+    episode_index = entry["episode_index"]
+    first_chunk = start_frame // EPISODE_CHUNK_FRAMES
+    last_chunk = (end_frame - 1) // EPISODE_CHUNK_FRAMES
+
+    chunks = {}
+    missing_chunks = []
+    for chunk in range(first_chunk, last_chunk + 1):
+        records = episode_cache.get((episode_index, chunk, image_columns))
+        if records is None:
+            missing_chunks.append(chunk)
+        else:
+            chunks[chunk] = records
+
+    # 연속된 미스 청크는 한 번의 윈도우 읽기로 가져옴
+    for _, run in itertools.groupby(
+        enumerate(missing_chunks), key=lambda item: item[1] - item[0]
+    ):
+        run = [chunk for _, chunk in run]
+        window = [
+            dumps_json(record)
+            for record in frame_records(
+                load_episode_window(
+                    entry,
+                    run[0] * EPISODE_CHUNK_FRAMES,
+                    len(run) * EPISODE_CHUNK_FRAMES,
+                    [*image_columns, *FRAME_FIELDS],
+                ),
+                image_columns,
+            )
+        ]
+        for position, chunk in enumerate(run):
+            records = window[
+                position * EPISODE_CHUNK_FRAMES : (position + 1) * EPISODE_CHUNK_FRAMES
+            ]
+            chunks[chunk] = records
+            episode_cache.put(
+                (episode_index, chunk, image_columns), records, estimate_size(records)
+            )
+
+    if missing_chunks:
+        logger.info(
+            f"📦 에피소드 {episode_index} 청크 {len(missing_chunks)}개 로드, "
+            f"{last_chunk - first_chunk + 1 - len(missing_chunks)}개 캐시 재사용"
+        )
+
+    frames = [
+        record for chunk in range(first_chunk, last_chunk + 1) for record in chunks[chunk]
+    ]
+    offset = start_frame - first_chunk * EPISODE_CHUNK_FRAMES
+    return frames[offset : offset + end_frame - start_frame]
+
+
+def iter_episode_frames(entry, start_frame, end_frame, image_columns=DEFAULT_IMAGE_COLUMNS):
+    """청크 경계 단위로 직렬화된 프레임을 읽어 하나씩 반환 (요청당 메모리는 청크 하나 분량)"""
+    position = start_frame
+    while position < end_frame:
+        chunk_end = min(
+            (position // EPISODE_CHUNK_FRAMES + 1) * EPISODE_CHUNK_FRAMES, end_frame
+        )
+        yield from load_episode_frames(entry, position, chunk_end, image_columns)
+        position = chunk_end
+
+
+def load_search_frames():
+    """궤적 검색용 프레임 테이블을 반환 (처음 한 번만 생성, 동시 요청은 같은 결과를 기다림)"""
+    global search_frames
+    with search_frames_lock:
+        if search_frames is None:
+            started = time.time()
+            search_frames = build_search_frames(libero_frames(), LIBERO_FPS)
+            logger.info(
+                f"🔎 검색 테이블 생성 완료: {search_frames.height}프레임 "
+                f"({time.time() - started:.2f}s, {search_frames.estimated_size() / 1024 / 1024:.1f}MB)"
+            )
+        return search_frames
+
+
+def load_episode_hashes(entry):
+    """에피소드 전체 프레임의 카메라별 dHash를 (프레임 수, 카메라 수) uint64 배열로 반환 (캐시)"""
+    cache_key = (entry["episode_index"], "dhash")
+    hashes = episode_cache.get(cache_key)
+    if hashes is None:
+        hashes = load_episode_window(
+            entry, 0, entry["length"], list(frame_hash_columns)
+        ).to_numpy()
+        episode_cache.put(cache_key, hashes, hashes.nbytes)
+    return hashes
+
+
+def dedup_runs(hashes, threshold):
+    """연속으로 거의 같은 프레임 구간을 찾아 [(구간 첫 위치, 프레임 수)] 반환
+
+    구간 첫 프레임과의 해밍 거리가 모든 카메라에서 threshold 이하인 동안 같은 구간으로 묶는다
+    (이웃 프레임끼리 비교하면 느린 움직임이 누적되어 구간이 끝없이 이어지므로 첫 프레임 기준).
+    """
+    runs = []
+    anchor = None
+    for position, row in enumerate(hashes.tolist()):
+        if anchor is not None and all(
+            (a ^ b).bit_count() <= threshold for a, b in zip(anchor, row)
+        ):
+            runs[-1][1] += 1
+        else:
+            anchor = row
+            runs.append([position, 1])
+    return runs
+
+
+def episode_dedup_runs(entry, start_frame, end_frame, threshold):
+    """[start_frame, end_frame) 구간의 dedup 구간 목록 (위치는 start_frame 기준)"""
+    return dedup_runs(load_episode_hashes(entry)[start_frame:end_frame], threshold)
+
+
+def collapse_frames(encoded_frames, runs):
+    """직렬화된 프레임 중 각 구간의 첫 프레임에만 repeat_count를 붙여 반환"""
+    run_lengths = dict(runs)
+    for position, frame in enumerate(encoded_frames):
+        repeat_count = run_lengths.get(position)
+        if repeat_count is not None:
+            yield with_raw_fields(frame, {"repeat_count": repeat_count})
+
+
+def episode_ndjson_lines(header, encoded_frames):
+    """첫 줄은 에피소드 메타데이터, 이후 직렬화된 프레임을 한 줄씩 NDJSON으로 생성"""
+    yield dumps_json(header) + b"\n"
+    try:
+        for frame in encoded_frames:
+            yield frame + b"\n"
+    except Exception as e:
+        # 응답 상태 코드는 이미 전송되었으므로 오류를 마지막 줄로 알림
+        logger.error(f"❌ 에피소드 {header['episode_index']} 스트리밍 실패: {e}")
+        logger.error(f"스택트레이스:\n{traceback.format_exc()}")
+        yield dumps_json({"error": f"에피소드 스트리밍 실패: {str(e)}"}) + b"\n"
+
+
+def episode_json_body(encoded_frames, fields):
+    """직렬화된 프레임들을 이어 붙여 에피소드 응답 본문(JSON 바이트) 생성"""
+    return json_object_with_raw({"frames": join_json_array(encoded_frames)}, fields)
+
+
+def dummy_frame(
+    episode_index, frame_offset, position, total_frames, image_columns=DEFAULT_IMAGE_COLUMNS
+):
+    """더미 모드 프레임 레코드 생성 (이미지는 image_columns 화질 단계 크기로 인코딩)"""
+    i = position
+    main_img = create_dummy_image(f"Main {i}", (256, 256))
+    wrist_img = create_dummy_image(f"Wrist {i}", (256, 256))
+
+    state = [
+        0.5 + 0.1 * np.sin(i * 0.1),
+        0.0 + 0.05 * np.cos(i * 0.1),
+        0.3 + 0.02 * i / total_frames,
+        0.0,
+        0.0,
+        0.0,
+        1.0,
+        0.05 - 0.04 * (i / total_frames),
+    ]
+
+    actions = [
+        0.01 * np.sin(i * 0.2),
+        0.01 * np.cos(i * 0.2),
+        0.005,
+        0.0,
+        0.0,
+        0.0,
+        -1 if i > total_frames / 2 else 1,
+    ]
+
+    return {
+        "image": image_to_base64(
+            main_img, quality=75, max_size=image_column_size(image_columns[0])
+        ),
+        "wrist_image": image_to_base64(
+            wrist_img, quality=75, max_size=image_column_size(image_columns[1])
+        ),
+        "state": state,
+        "actions": actions,
+        "timestamp": i * 0.1,
+        "frame_index": frame_offset + i,
+        "episode_index": episode_index,
+        "task_index": episode_index % 40,
+    }
+
+
+def dummy_frames(episode_index, frame_offset, total_frames, image_columns=DEFAULT_IMAGE_COLUMNS):
+    """더미 모드 프레임을 JSON 바이트 목록으로 생성"""
+    return [
+        dumps_json(dummy_frame(episode_index, frame_offset, i, total_frames, image_columns))
+        for i in range(total_frames)
+    ]
+
+
+def dummy_episode_list():
+    """더미 모드 에피소드 목록 (get_episode 더미 데이터와 같은 길이)"""
+    episodes = []
+    for i in range(100):
+        frame_count = 120 + (i % 80)  # get_episode와 동일한 계산
+        episodes.append(
+            {
+                "episode_index": i,
+                "task_index": i % 40,
+                "frame_count": frame_count,
+                "start_timestamp": 0.0,
+                "end_timestamp": frame_count * 0.1,  # 10 FPS 기준
+                "duration": frame_count * 0.1,
+            }
+        )
+    return episodes
+
+
+def dummy_jpeg(text, quality=75, size=256):
+    """더미 이미지를 JPEG 바이트로 인코딩"""
+    buffer = io.BytesIO()
+    create_dummy_image(text, (size, size)).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def load_episode_window(entry, start_frame, length, columns=None):
+    """에피소드 인덱스 항목을 이용해 프레임 윈도우를 읽음"""
+    # 윈도우를 에피소드 안으로 제한 (음수 오프셋이면 이전 에피소드의 행을 읽게 됨)
+    start_frame = min(max(start_frame, 0), entry["length"])
+    length = max(min(length, entry["length"] - start_frame), 0)
+    if entry["contiguous"]:
+        return read_frame_rows(entry["start_row"] + start_frame, length, columns)
+
+    # 연속 저장되지 않은 에피소드는 필터 + 정렬 경로로 대체
+    episode_frames = (
+        libero_frames()
+        .filter(pl.col("episode_index") == entry["episode_index"])
+        .sort("frame_index")
+    )
+    if columns:
+        episode_frames = episode_frames.select(columns)
+    return episode_frames.slice(start_frame, length).collect()
+
+
+def build_thumbnail_jpegs(episode_indices):
+    """에피소드들의 작은 썸네일 JPEG를 (task_index, JPEG 바이트)로 반환
+
+    변환 시 만든 미리보기가 있으면 그대로 쓰고, 없으면 첫 프레임을 읽어 줄인다.
+    연속 저장된 에피소드의 첫 프레임은 한 번의 gather 쿼리로 함께 읽는다.
+    데이터에 없는 에피소드는 결과에서 빠진다.
+    """
+    if libero_df is None:
+        return {
+            episode_index: (
+                episode_index % 40,
+                dummy_jpeg(f"Episode {episode_index}", quality=80, size=PREVIEW_THUMBNAIL_SIZE),
+            )
+            for episode_index in episode_indices
+        }
+
+    thumbnails = {}
+    entries = []
+    for episode_index in episode_indices:
+        preview = episode_previews.get(episode_index)
+        if preview is not None:
+            thumbnails[episode_index] = (preview["task_index"], preview["thumbnail"])
+        elif episode_index in episode_lookup:
+            entries.append(episode_lookup[episode_index])
+
+    columns = ["episode_index", "task_index", "main_image"]
+    contiguous_rows = [entry["start_row"] for entry in entries if entry["contiguous"]]
+    first_frames = []
+    if contiguous_rows:
+        first_frames.append(gather_frame_rows(contiguous_rows, columns))
+    first_frames.extend(
+        load_episode_window(entry, 0, 1, columns) for entry in entries if not entry["contiguous"]
+    )
+
+    if first_frames:
+        for row in pl.concat(first_frames).iter_rows(named=True):
+            thumbnails[row["episode_index"]] = (
+                row["task_index"],
+                resize_jpeg(row["main_image"], PREVIEW_THUMBNAIL_SIZE),
+            )
+    return thumbnails
+
+
+def build_thumbnail_bodies(episode_indices):
+    """에피소드들의 썸네일 응답(JSON 바이트)을 만들어 캐시에 저장하고 반환"""
+    bodies = {}
+    for episode_index, (task_index, jpeg_bytes) in build_thumbnail_jpegs(episode_indices).items():
+        body = dumps_json(
+            {
+                "episode_index": episode_index,
+                "task_index": task_index,
+                "thumbnail": base64.b64encode(jpeg_bytes).decode(),
+            }
+        )
+        thumbnail_cache.put(episode_index, body, estimate_size(body))
+        bodies[episode_index] = body
+    return bodies
+
+
+def load_episode_sprite(episode_index):
+    """에피소드 스프라이트 시트(이미지 + 타일 오프셋) 반환
+
+    변환 시 만든 미리보기가 없으면 N프레임마다 한 장씩 읽어 만들고 캐시한다.
+    """
+    preview = episode_previews.get(episode_index)
+    if preview is not None:
+        return preview
+
+    cache_key = ("sprite", episode_index)
+    sprite = thumbnail_cache.get(cache_key)
+    if sprite is not None:
+        return sprite
+
+    if libero_df is None:
+        frame_total = 120 + (episode_index % 80)  # get_episode 더미 데이터와 동일
+        frames = list(range(0, frame_total, SPRITE_FRAME_STEP))
+        sprite = {
+            "episode_index": episode_index,
+            "task_index": episode_index % 40,
+            "frame_step": SPRITE_FRAME_STEP,
+            **compose_sprite_sheet([dummy_jpeg(f"main {frame}") for frame in frames], frames),
+        }
+    else:
+        entry = episode_lookup.get(episode_index)
+        if entry is None:
+            return None
+        columns = ["episode_index", "task_index", "main_image"]
+        if entry["contiguous"]:
+            sampled = gather_frame_rows(
+                list(range(entry["start_row"], entry["start_row"] + entry["length"], SPRITE_FRAME_STEP)),
+                columns,
+            )
+        else:
+            sampled = load_episode_window(entry, 0, entry["length"], columns).gather_every(
+                SPRITE_FRAME_STEP
+            )
+        sprite = build_episode_preview(sampled, SPRITE_FRAME_STEP)
+
+    thumbnail_cache.put(cache_key, sprite, estimate_size(sprite))
+    return sprite
+
+
+def open_jpeg_pack(episode_index, column):
+    """에피소드/컬럼의 JPEG 팩을 메모리 매핑해 (mmap, 오프셋 배열)로 반환
+
+    팩은 페이지 캐시에서 바로 읽히며, 열어 둔 팩 수는 JPEG_PACK_OPEN_FILES로 제한한다.
+    닫힌 팩을 쓰던 요청이 있어도 참조가 남아 있는 동안에는 매핑이 유지된다.
+    """
+    key = (episode_index, column)
+    with open_jpeg_packs_lock:
+        pack = open_jpeg_packs.get(key)
+        if pack is not None:
+            open_jpeg_packs.move_to_end(key)
+            return pack
+
+    pack_path, index_path = jpeg_pack_paths(
+        os.path.join(DATA_PATH, JPEG_PACK_DIR), episode_index, column
+    )
+    with open(pack_path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    pack = (data, np.fromfile(index_path, dtype=PACK_INDEX_DTYPE))
+
+    with open_jpeg_packs_lock:
+        open_jpeg_packs[key] = pack
+        while len(open_jpeg_packs) > JPEG_PACK_OPEN_FILES:
+            open_jpeg_packs.popitem(last=False)
+    return pack
+
+
+def read_pack_bytes(episode_index, column, start, end):
+    """JPEG 팩의 [start, end) 바이트 구간을 읽음"""
+    data, _ = open_jpeg_pack(episode_index, column)
+    return data[start:end]
+
+
+def read_pack_frame(episode_index, column, frame):
+    """JPEG 팩에서 프레임 하나의 JPEG 바이트를 오프셋 인덱스로 바로 읽음"""
+    data, offsets = open_jpeg_pack(episode_index, column)
+    return data[int(offsets[frame]) : int(offsets[frame + 1])]
+
+
+def parse_byte_range(range_header, total):
+    """단일 구간 bytes Range 헤더를 [start, end) 구간으로 변환
+
+    형식이 잘못되었거나 여러 구간이면 None(전체 응답), 파일 범위를 벗어나면 ValueError.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            start, end = max(total - int(last), 0), total
+        else:
+            start = int(first)
+            end = min(int(last) + 1, total) if last else total
+            if last and int(last) < start:
+                return None
+    except ValueError:
+        return None
+    if start >= total or start >= end:
+        raise ValueError(f"요청 범위가 파일 크기({total}바이트)를 벗어납니다")
+    return start, end
 
 
 def image_to_base64(img_array, quality=85, max_size=None):
@@ -259,6 +1121,42 @@ def create_dummy_image(text="Test", size=(256, 256)):
     return img
 
 
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 헤더가 주어진 ETag와 일치하는지 확인"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def dataset_etag(*parts):
+    """데이터셋 버전 + 요청 식별자로 ETag 생성 (Parquet 파일이 바뀌면 값이 바뀜)"""
+    return '"' + "-".join(str(part) for part in (libero_dataset_version, *parts)) + '"'
+
+
+def conditional_headers(etag, cache_control=REVALIDATE_CACHE_CONTROL):
+    """ETag / Last-Modified / Cache-Control 응답 헤더"""
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(libero_last_modified, usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """조건부 요청이 현재 버전과 같은지 확인 (If-None-Match 우선, 없으면 If-Modified-Since)"""
+    if "if-none-match" in request.headers:
+        return etag_matches(request, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        return parsedate_to_datetime(if_modified_since).timestamp() >= int(libero_last_modified)
+    except (TypeError, ValueError):
+        return False
+
+
 @app.get("/")
 async def read_root():
     """메인 페이지"""
@@ -340,13 +1238,37 @@ async def get_image_sequence(dataset_name: str, split: str, index: int):
         )
 
 
-@app.post("/api/datasets/{dataset_name}/{split}/search")
+@app.post("/api/datasets/{dataset_name}/{split}/search", response_class=FastJSONResponse)
 async def search_sequences(dataset_name: str, split: str, query: Dict[str, Any]):
-    """조건에 맞는 시퀀스 검색"""
+    """상태/액션 궤적 조건에 맞는 (에피소드, 프레임 구간) 검색
+
+    본문 예: {"predicates": [{"type": "gripper", "event": "close"}, {"type": "task", "in": [3, 7]}],
+    "match": "all", "min_frames": 1, "limit": 50, "cursor": null}
+    응답의 next_cursor를 다음 요청의 cursor로 보내면 이어서 조회한다.
+    """
     try:
-        # 임시로 빈 결과 반환
-        return {"indices": [], "total": 0}
+        if libero_df is None:
+            raise HTTPException(status_code=503, detail="검색할 Libero 데이터셋이 로드되지 않았습니다")
+        try:
+            plan = parse_search_query(query)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
+        table = await run_blocking(load_search_frames)
+        hits, next_cursor, total = await run_blocking(search_episode_ranges, table, plan)
+        logger.info(f"🔎 검색 완료: {total}개 구간 ({len(hits)}개 반환)")
+
+        return {
+            "dataset_name": dataset_name,
+            "split": split,
+            "hits": hits,
+            "indices": sorted({hit["episode_index"] for hit in hits}),
+            "total": total,
+            "next_cursor": next_cursor,
+        }
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"검색 중 오류 발생: {str(e)}")
 
@@ -359,9 +1281,7 @@ async def save_tagging_data(session_id: str, data: TaggingData):
         tagging_data_storage[session_id] = data.dict()
 
         # 파일로도 저장
-        os.makedirs("tagging_data", exist_ok=True)
-        with open(f"tagging_data/{session_id}.json", "w", encoding="utf-8") as f:
-            json.dump(data.dict(), f, ensure_ascii=False, indent=2)
+        await run_blocking(write_json_file, f"tagging_data/{session_id}.json", data.dict())
 
         return {"message": "태깅 데이터가 저장되었습니다", "session_id": session_id}
     except Exception as e:
@@ -379,8 +1299,7 @@ async def load_tagging_data(session_id: str):
         # 파일에서 로드
         file_path = f"tagging_data/{session_id}.json"
         if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = await run_blocking(read_json_file, file_path)
             return TaggingData(**data)
 
         raise HTTPException(status_code=404, detail="태깅 데이터를 찾을 수 없습니다")
@@ -438,8 +1357,8 @@ async def upload_images(files: List[UploadFile] = File(...)):
 # ===== LIBERO API 엔드포인트들 =====
 
 
-@app.get("/api/libero/info")
-async def get_libero_info():
+@app.get("/api/libero/info", response_class=FastJSONResponse)
+async def get_libero_info(request: Request):
     """Libero 데이터셋 정보 반환"""
     try:
         if libero_dataset is None:
@@ -456,22 +1375,37 @@ async def get_libero_info():
                 "error": dataset_load_error,
             }
 
-        logger.info("📊 실제 데이터셋 정보 반환 중...")
+        headers = conditional_headers(dataset_etag("info", LIBERO_LOAD_MODE))
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        if dataset_manifest is None:
+            # 더미 데이터 모드: 실제 Libero 데이터셋 규모 표시
+            totals = {
+                "total_frames": 273465,
+                "total_episodes": 1693,
+                "total_tasks": 40,
+                "content_hash": None,
+            }
+        else:
+            # 로드된 데이터의 실제 합계 (매니페스트에서 미리 계산)
+            totals = {
+                key: dataset_manifest[key]
+                for key in ("total_frames", "total_episodes", "total_tasks", "content_hash")
+            }
 
-        # 실제 데이터셋 정보 (Physical Intelligence Libero)
-        return {
+        return FastJSONResponse({
             "name": "physical-intelligence/libero",
             "description": "LIBERO: Long-Horizon Robot Manipulation Benchmark",
-            "total_frames": 273465,  # 실제 전체 프레임 수
-            "total_episodes": 1693,  # 실제 전체 에피소드 수 
-            "total_tasks": 40,       # 실제 전체 태스크 수
+            **totals,
             "fps": 10,
             "robot_type": "panda",
             "codebase_version": "v2.0",
             "status": "loaded",
             "sample_loaded": True,   # 샘플 데이터 로드됨
-            "streaming_mode": True,  # 스트리밍 모드 사용
-        }
+            "streaming_mode": LIBERO_LOAD_MODE == "lazy",  # Parquet 직접 스트리밍 여부
+            "load_mode": LIBERO_LOAD_MODE,
+        }, headers=headers)
     except Exception as e:
         logger.error(f"❌ 데이터셋 정보 조회 실패: {e}")
         raise HTTPException(
@@ -479,96 +1413,70 @@ async def get_libero_info():
         )
 
 
-@app.get("/api/libero/tasks")
-async def get_tasks():
+@app.get("/api/libero/tasks", response_class=FastJSONResponse)
+async def get_tasks(request: Request):
     """사용 가능한 태스크 목록 반환"""
     try:
+        headers = conditional_headers(dataset_etag("tasks"))
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
         if libero_df is None:
             # 하드코딩된 태스크 정보
             logger.info("📋 더미 데이터에서 태스크 정보 생성 중...")
-            return [
-                {"task_index": i, "episode_count": 42, "description": f"Task {i}"}
-                for i in range(40)
-            ]
-
-        logger.info("📋 Polars 데이터프레임에서 태스크 정보 집계 중...")
-
-        # task_index를 기준으로 그룹화하여 정보 집계
-        task_info_df = libero_df.group_by("task_index").agg(
-            pl.n_unique("episode_index").alias("episode_count"),
-            pl.count().alias("frame_count")
-        ).sort("task_index")
-
-        tasks = []
-        for row in task_info_df.to_dicts():
-            tasks.append({
-                "task_index": row["task_index"],
-                "episode_count": row["episode_count"],
-                "frame_count": row["frame_count"],
-                "description": f"Task {row['task_index']}",  # Parquet에 설명이 없으므로 생성
-                "real_libero_task": True
-            })
+            return FastJSONResponse(
+                [
+                    {"task_index": i, "episode_count": 42, "description": f"Task {i}"}
+                    for i in range(40)
+                ],
+                headers=headers,
+            )
 
-        logger.info(f"✅ {len(tasks)}개 태스크 정보 집계 완료")
-        return tasks
+        return FastJSONResponse(manifest_tasks, headers=headers)
 
     except Exception as e:
         logger.error(f"❌ 태스크 정보 로드 실패: {e}")
         raise HTTPException(status_code=500, detail=f"태스크 정보 로드 실패: {str(e)}")
 
 
-@app.get("/api/libero/episodes")
-async def get_episodes_list(task_index: Optional[int] = None, limit: int = 50):
-    """에피소드 목록 반환"""
+@app.get("/api/libero/episodes", response_class=FastJSONResponse)
+async def get_episodes_list(
+    request: Request,
+    task_index: Optional[int] = None,
+    limit: int = 50,
+    after_episode: Optional[int] = None,
+    sort_by: str = "episode_index",
+    descending: bool = False,
+):
+    """에피소드 목록 반환 (after_episode 커서 기반 페이지네이션, 다음 커서는 X-Next-Cursor 헤더)"""
     try:
-        if libero_df is None:
-            # 하드코딩된 에피소드 목록 (get_episode와 일치하도록 수정)
-            episodes = []
-            for i in range(min(limit, 100)):
-                frame_count = 120 + (i % 80)  # get_episode와 동일한 계산
-                episodes.append(
-                    {
-                        "episode_index": i,
-                        "task_index": i % 40,
-                        "frame_count": frame_count,
-                        "start_timestamp": 0.0,
-                        "end_timestamp": frame_count * 0.1,  # 10 FPS 기준
-                    }
-                )
-            return episodes
+        if sort_by not in EPISODE_SORT_KEYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"sort_by는 {', '.join(EPISODE_SORT_KEYS)} 중 하나여야 합니다",
+            )
+        if after_episode is not None and after_episode not in listing_episode_lookup:
+            raise HTTPException(
+                status_code=400, detail=f"커서 에피소드 {after_episode}를 찾을 수 없습니다"
+            )
 
-        logger.info(
-            f"📋 Polars 데이터프레임에서 에피소드 목록 집계 중... (task_index: {task_index}, limit: {limit})"
-        )
-
-        # 에피소드별 통계 집계
-        query = libero_df.group_by("episode_index").agg([
-            pl.n_unique("frame_index").alias("frame_count"),
-            pl.first("task_index").alias("task_index"),
-            pl.min("timestamp").alias("start_timestamp"),
-            pl.max("timestamp").alias("end_timestamp")
-        ]).sort("episode_index")
-
-        # 태스크 필터링
-        if task_index is not None:
-            query = query.filter(pl.col("task_index") == task_index)
-
-        # 결과 제한
-        episodes_df = query.head(limit)
-        
-        episodes = []
-        for row in episodes_df.to_dicts():
-            episodes.append({
-                "episode_index": row["episode_index"],
-                "task_index": row["task_index"],
-                "frame_count": row["frame_count"],
-                "start_timestamp": row["start_timestamp"],
-                "end_timestamp": row["end_timestamp"],
-            })
-        
-        logger.info(f"✅ {len(episodes)}개 실제 에피소드 정보 집계 완료")
-        return episodes
+        headers = conditional_headers(
+            dataset_etag("episodes", task_index, limit, after_episode, sort_by, descending)
+        )
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        # 미리 정렬된 에피소드 통계 목록에서 커서 위치를 찾아 잘라서 반환
+        episodes, next_cursor, total = page_episodes(
+            task_index, sort_by, descending, after_episode, limit
+        )
+        headers["X-Total-Count"] = str(total)
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = str(next_cursor)
+        return FastJSONResponse(episodes, headers=headers)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ 에피소드 목록 로드 실패: {e}")
         raise HTTPException(
@@ -576,161 +1484,218 @@ async def get_episodes_list(task_index: Optional[int] = None, limit: int = 50):
         )
 
 
-@app.get("/api/libero/episode/{episode_index}")
-async def get_episode(episode_index: int, start_frame: int = 0, frame_count: int = 500):
-    """특정 에피소드의 프레임 데이터 반환"""
-    try:
-        logger.info(
-            f"🎬 에피소드 {episode_index} 요청 (프레임 {start_frame}-{start_frame+frame_count})"
+def validate_episode_query(stream, start_frame, dedup):
+    """에피소드 요청의 stream / start_frame / dedup 파라미터 검증 (잘못되면 400)"""
+    if stream is not None and stream != "ndjson":
+        raise HTTPException(
+            status_code=400, detail=f"지원하지 않는 stream 형식입니다: {stream}"
+        )
+    if start_frame < 0:
+        raise HTTPException(
+            status_code=400, detail="start_frame은 0 이상이어야 합니다"
+        )
+    if dedup is None:
+        return
+    if not 0 <= dedup <= MAX_DEDUP_DISTANCE:
+        raise HTTPException(
+            status_code=400, detail=f"dedup은 0-{MAX_DEDUP_DISTANCE} 사이여야 합니다"
+        )
+    if not frame_hash_columns:
+        raise HTTPException(
+            status_code=400,
+            detail="프레임 해시 컬럼이 없어 dedup을 사용할 수 없습니다 "
+            "(convert_to_polars.py --add-hashes로 추가)",
         )
 
-        # 캐시 키 생성
-        cache_key = f"{episode_index}_{start_frame}_{frame_count}"
-
-        # 캐시 확인
-        if cache_key in episode_cache:
-            logger.info(f"✅ 캐시에서 에피소드 {episode_index} 반환")
-            return episode_cache[cache_key]
 
-        if libero_df is None:
-            logger.info("🔧 더미 데이터로 응답 생성 중...")
-
-            # 에피소드 목록과 일치하는 프레임 개수 계산
-            episode_total_frames = 120 + (episode_index % 80)  # 120-200 프레임
-            
-            # 더미 데이터로 응답
-            frames = []
-            # 요청된 범위 내에서 실제 에피소드 길이만큼 생성
-            actual_frame_count = min(frame_count, episode_total_frames - start_frame)
-            if actual_frame_count <= 0:
-                actual_frame_count = 0
-            
-            total_frames = actual_frame_count
-
-            for i in range(total_frames):
-                logger.debug(f"더미 프레임 {i}/{total_frames} 생성 중...")
-
-                main_img = create_dummy_image(f"Main {i}", (256, 256))
-                wrist_img = create_dummy_image(f"Wrist {i}", (256, 256))
-
-                state = [
-                    0.5 + 0.1 * np.sin(i * 0.1),
-                    0.0 + 0.05 * np.cos(i * 0.1),
-                    0.3 + 0.02 * i / total_frames,
-                    0.0,
-                    0.0,
-                    0.0,
-                    1.0,
-                    0.05 - 0.04 * (i / total_frames),
-                ]
-
-                actions = [
-                    0.01 * np.sin(i * 0.2),
-                    0.01 * np.cos(i * 0.2),
-                    0.005,
-                    0.0,
-                    0.0,
-                    0.0,
-                    -1 if i > total_frames / 2 else 1,
-                ]
-
-                frame_data = {
-                    "image": image_to_base64(main_img, quality=75, max_size=512),
-                    "wrist_image": image_to_base64(wrist_img, quality=75, max_size=256),
-                    "state": state,
-                    "actions": actions,
-                    "timestamp": i * 0.1,
-                    "frame_index": start_frame + i,
-                    "episode_index": episode_index,
-                    "task_index": episode_index % 40,
-                }
-                frames.append(frame_data)
-
-            result = {
-                "frames": frames,
-                "episode_index": episode_index,
-                "task_index": episode_index % 40,
-                "total_frames": total_frames,
-                "metadata": {
-                    "total_frames_in_episode": episode_total_frames,  # 에피소드의 실제 총 프레임 수
-                    "returned_frames": len(frames),
-                    "start_frame": start_frame,
-                    "end_frame": start_frame + total_frames,
-                    "mode": "dummy_data",
-                },
-            }
+def ndjson_episode_response(header, encoded_frames, headers):
+    """메타데이터 한 줄 뒤에 직렬화된 프레임을 한 줄씩 스트리밍하는 응답"""
+    return StreamingResponse(
+        iterate_blocking(episode_ndjson_lines(header, encoded_frames)),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
 
-            episode_cache[cache_key] = result
-            logger.info(
-                f"✅ 더미 에피소드 {episode_index} 생성 완료 ({len(frames)} 프레임)"
-            )
-            return result
 
-        logger.info("📂 Polars로 실제 데이터에서 에피소드 로드 중...")
+async def dummy_episode_response(
+    episode_index, start_frame, frame_count, stream, image_columns, headers
+):
+    """더미 데이터 모드의 에피소드 응답 (JSON 본문은 요청 윈도우 단위로 캐시)"""
+    # 에피소드 목록과 일치하는 프레임 개수 계산
+    episode_total_frames = 120 + (episode_index % 80)  # 120-200 프레임
+    # 요청된 범위 내에서 실제 에피소드 길이만큼 생성
+    total_frames = max(min(frame_count, episode_total_frames - start_frame), 0)
+    fields = {
+        "episode_index": episode_index,
+        "task_index": episode_index % 40,
+        "total_frames": total_frames,
+        "metadata": {
+            "total_frames_in_episode": episode_total_frames,  # 에피소드의 실제 총 프레임 수
+            "returned_frames": total_frames,
+            "start_frame": start_frame,
+            "end_frame": start_frame + total_frames,
+            "mode": "dummy_data",
+        },
+    }
+
+    if stream == "ndjson":
+        frames = (
+            dumps_json(dummy_frame(episode_index, start_frame, i, total_frames, image_columns))
+            for i in range(total_frames)
+        )
+        return ndjson_episode_response(fields, frames, headers)
 
-        # Polars로 해당 에피소드의 프레임들을 빠르게 필터링
-        episode_frames = libero_df.filter(
-            pl.col("episode_index") == episode_index
-        ).sort("frame_index")
+    # 더미 응답은 요청 윈도우 전체의 직렬화된 본문을 하나의 캐시 항목으로 저장
+    cache_key = ("dummy", episode_index, start_frame, frame_count, image_columns)
+    cached = episode_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"✅ 캐시에서 에피소드 {episode_index} 반환")
+        return FastJSONResponse(cached, headers=headers)
 
-        if episode_frames.height == 0:
-            logger.warning(f"⚠️  에피소드 {episode_index}를 찾을 수 없음")
-            raise HTTPException(
-                status_code=404, detail=f"에피소드 {episode_index}를 찾을 수 없습니다"
-            )
+    logger.info("🔧 더미 데이터로 응답 생성 중...")
 
-        logger.info(
-            f"📋 에피소드 {episode_index}에서 {episode_frames.height} 프레임 발견"
-        )
+    frames = await run_blocking(
+        dummy_frames, episode_index, start_frame, total_frames, image_columns
+    )
+    body = episode_json_body(frames, fields)
 
-        # 요청된 범위의 프레임만 선택
-        end_frame = min(start_frame + frame_count, episode_frames.height)
-        selected_frames = episode_frames.slice(start_frame, end_frame - start_frame)
+    episode_cache.put(cache_key, body, estimate_size(body))
+    logger.info(
+        f"✅ 더미 에피소드 {episode_index} 생성 완료 ({len(frames)} 프레임)"
+    )
+    return FastJSONResponse(body, headers=headers)
+
+
+async def episode_dedup(entry, start_frame, end_frame, dedup):
+    """dedup 요청이면 (구간 목록, 응답 메타데이터)를, 아니면 (None, {})를 반환
+
+    구간은 작은 해시 컬럼만으로 미리 계산한다 (이미지 컬럼은 읽지 않음).
+    """
+    if dedup is None:
+        return None, {}
+    runs = await run_blocking(episode_dedup_runs, entry, start_frame, end_frame, dedup)
+    return runs, {
+        "dedup": dedup,
+        "collapsed_frames": max(end_frame - start_frame, 0) - len(runs),
+    }
+
+
+async def indexed_episode_response(
+    entry, start_frame, frame_count, stream, image_columns, dedup, headers
+):
+    """에피소드 인덱스로 찾은 실제 데이터의 에피소드 응답 (청크 캐시에 없는 부분만 읽음)"""
+    episode_index = entry["episode_index"]
+    total_frames_in_episode = entry["length"]
+    logger.info(
+        f"📋 에피소드 {episode_index}에서 {total_frames_in_episode} 프레임 발견"
+    )
 
-        logger.info(
-            f"🎯 선택된 프레임 범위: {start_frame}-{end_frame} ({selected_frames.height} 프레임)"
-        )
-
-        frames = []
-        for idx, row in enumerate(selected_frames.iter_rows(named=True)):
-            logger.debug(f"프레임 {idx+1}/{selected_frames.height} 처리 중...")
-
-            # JSON 문자열을 파싱
-            state = json.loads(row["state"])
-            actions = json.loads(row["actions"])
-
-            frame_data = {
-                "image": row["main_image"],  # 이미 base64 인코딩된 상태
-                "wrist_image": row["wrist_image"],  # 이미 base64 인코딩된 상태
-                "state": state,
-                "actions": actions,
-                "timestamp": row["timestamp"],
-                "frame_index": row["frame_index"],
-                "episode_index": row["episode_index"],
-                "task_index": row["task_index"],
-            }
-            frames.append(frame_data)
+    # 요청된 범위의 프레임만 선택
+    end_frame = min(start_frame + frame_count, total_frames_in_episode)
+    runs, dedup_metadata = await episode_dedup(entry, start_frame, end_frame, dedup)
 
-        result = {
-            "frames": frames,
+    def episode_fields(returned_frames):
+        return {
             "episode_index": episode_index,
-            "task_index": selected_frames.row(0, named=True)["task_index"],
-            "total_frames": len(frames),
+            "task_index": entry["task_index"],
+            "total_frames": returned_frames,
             "metadata": {
-                "total_frames_in_episode": episode_frames.height,
-                "returned_frames": len(frames),
+                "total_frames_in_episode": total_frames_in_episode,
+                "returned_frames": returned_frames,
                 "start_frame": start_frame,
                 "end_frame": end_frame,
                 "mode": "polars_data",
+                **dedup_metadata,
             },
         }
 
-        # 캐시에 저장
-        episode_cache[cache_key] = result
-        logger.info(f"✅ 에피소드 {episode_index} 로드 완료 ({len(frames)} 프레임)")
+    if stream == "ndjson":
+        returned_frames = max(end_frame - start_frame, 0) if runs is None else len(runs)
+        logger.info(f"📡 에피소드 {episode_index} NDJSON 스트리밍 시작 ({returned_frames} 프레임)")
+        encoded_frames = iter_episode_frames(entry, start_frame, end_frame, image_columns)
+        if runs is not None:
+            encoded_frames = collapse_frames(encoded_frames, runs)
+        return ndjson_episode_response(episode_fields(returned_frames), encoded_frames, headers)
+
+    frames = await run_blocking(
+        load_episode_frames, entry, start_frame, end_frame, image_columns
+    )
+    if runs is not None:
+        frames = list(collapse_frames(frames, runs))
+
+    logger.info(
+        f"🎯 선택된 프레임 범위: {start_frame}-{end_frame} ({len(frames)} 프레임)"
+    )
+
+    # 캐시에 있던 직렬화된 프레임을 그대로 이어 붙여 응답 (프레임 재직렬화 없음)
+    body = episode_json_body(frames, episode_fields(len(frames)))
+
+    logger.info(f"✅ 에피소드 {episode_index} 로드 완료 ({len(frames)} 프레임)")
+
+    return FastJSONResponse(body, headers=headers)
+
+
+@app.get("/api/libero/episode/{episode_index}", response_class=FastJSONResponse)
+async def get_episode(
+    request: Request,
+    episode_index: int,
+    start_frame: int = 0,
+    frame_count: int = 500,
+    stream: Optional[str] = None,
+    size: Optional[int] = None,
+    quality: Optional[str] = None,
+    dedup: Optional[int] = None,
+):
+    """특정 에피소드의 프레임 데이터 반환
 
-        return result
+    stream=ndjson이면 메타데이터 한 줄 뒤에 프레임을 한 줄씩 생성되는 대로 전송한다.
+    size=(px) 또는 quality=low|medium|high로 변환 시 저장된 화질 단계 이미지를 고른다.
+    dedup=(해밍 거리 0-64)이면 거의 같은 연속 프레임을 첫 프레임 하나와 repeat_count로 묶는다.
+    """
+    try:
+        logger.info(
+            f"🎬 에피소드 {episode_index} 요청 (프레임 {start_frame}-{start_frame+frame_count})"
+        )
+
+        validate_episode_query(stream, start_frame, dedup)
+        image_columns = select_image_columns(image_target_size(size, quality))
+        headers = conditional_headers(
+            dataset_etag(
+                "episode",
+                episode_index,
+                start_frame,
+                frame_count,
+                stream or "json",
+                *image_columns,
+                dedup,
+            )
+        )
+        episode_exists = libero_df is None or episode_index in episode_lookup
+        if episode_exists and is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        if libero_df is None:
+            return await dummy_episode_response(
+                episode_index, start_frame, frame_count, stream, image_columns, headers
+            )
+
+        logger.info("📂 Polars로 실제 데이터에서 에피소드 로드 중...")
 
+        # 에피소드 인덱스로 위치를 바로 찾음 (전체 스캔/정렬 없음)
+        entry = episode_lookup.get(episode_index)
+
+        if entry is None:
+            logger.warning(f"⚠️  에피소드 {episode_index}를 찾을 수 없음")
+            raise HTTPException(
+                status_code=404, detail=f"에피소드 {episode_index}를 찾을 수 없습니다"
+            )
+
+        return await indexed_episode_response(
+            entry, start_frame, frame_count, stream, image_columns, dedup, headers
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ 에피소드 {episode_index} 로드 실패: {str(e)}")
         logger.error(f"스택트레이스:\n{traceback.format_exc()}")
@@ -740,70 +1705,554 @@ async def get_episode(episode_index: int, start_frame: int = 0, frame_count: int
         raise HTTPException(status_code=500, detail=f"에피소드 로드 실패: {str(e)}")
 
 
-@app.get("/api/libero/episode/{episode_index}/thumbnail")
-async def get_episode_thumbnail(episode_index: int):
+@app.get("/api/libero/episode/{episode_index}/thumbnail", response_class=FastJSONResponse)
+async def get_episode_thumbnail(request: Request, episode_index: int):
     """에피소드 썸네일 반환"""
     try:
         logger.info(f"🖼️  에피소드 {episode_index} 썸네일 요청")
 
+        headers = conditional_headers(dataset_etag("thumbnail", episode_index, PREVIEW_THUMBNAIL_SIZE))
+        episode_exists = libero_df is None or episode_index in episode_lookup
+        if episode_exists and is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
         # 캐시 확인
-        if episode_index in thumbnail_cache:
+        cached = thumbnail_cache.get(episode_index)
+        if cached is not None:
             logger.info(f"✅ 캐시에서 썸네일 {episode_index} 반환")
-            return thumbnail_cache[episode_index]
+            return FastJSONResponse(cached, headers=headers)
 
-        if libero_df is None:
-            logger.info("🔧 더미 썸네일 생성 중...")
-            thumb_img = create_dummy_image(f"Episode {episode_index}", (256, 256))
-            result = {
-                "episode_index": episode_index,
-                "task_index": episode_index % 40,
-                "thumbnail": image_to_base64(thumb_img, quality=80, max_size=256),
-            }
-            thumbnail_cache[episode_index] = result
-            return result
+        body = (await run_blocking(build_thumbnail_bodies, [episode_index])).get(episode_index)
+        if body is None:
+            logger.warning(f"⚠️  에피소드 {episode_index} 썸네일을 찾을 수 없음")
+            raise HTTPException(
+                status_code=404, detail=f"에피소드 {episode_index}를 찾을 수 없습니다"
+            )
 
-        logger.info(f"🔍 Polars로 에피소드 {episode_index} 첫 프레임 검색 중...")
+        logger.info(f"✅ 에피소드 {episode_index} 썸네일 생성 완료")
+        return FastJSONResponse(body, headers=headers)
 
-        # Polars로 첫 번째 프레임 빠르게 찾기
-        first_frame = (
-            libero_df.filter(pl.col("episode_index") == episode_index)
-            .sort("frame_index")
-            .head(1)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 썸네일 {episode_index} 로드 실패: {str(e)}")
+        if "찾을 수 없습니다" in str(e):
+            raise e
+        raise HTTPException(status_code=500, detail=f"썸네일 로드 실패: {str(e)}")
+
+
+@app.post("/api/libero/thumbnails", response_class=FastJSONResponse)
+async def get_episode_thumbnails(batch: ThumbnailBatchRequest):
+    """여러 에피소드의 썸네일을 한 번에 반환 (캐시에 없는 첫 프레임은 한 번의 쿼리로 읽음)"""
+    try:
+        episode_indices = list(dict.fromkeys(batch.episode_indices))
+        if len(episode_indices) > MAX_THUMBNAIL_BATCH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"한 번에 최대 {MAX_THUMBNAIL_BATCH}개 에피소드까지 요청할 수 있습니다",
+            )
+
+        bodies = {}
+        uncached = []
+        for episode_index in episode_indices:
+            cached = thumbnail_cache.get(episode_index)
+            if cached is None:
+                uncached.append(episode_index)
+            else:
+                bodies[episode_index] = cached
+
+        if uncached:
+            bodies.update(await run_blocking(build_thumbnail_bodies, uncached))
+
+        logger.info(
+            f"🖼️  썸네일 {len(episode_indices)}개 요청 "
+            f"(캐시 {len(episode_indices) - len(uncached)}개, 새로 읽음 {len(uncached)}개)"
         )
 
-        if first_frame.height == 0:
-            logger.warning(f"⚠️  에피소드 {episode_index} 썸네일을 찾을 수 없음")
+        return FastJSONResponse(
+            json_object_with_raw(
+                {"thumbnails": join_json_array([bodies[e] for e in episode_indices if e in bodies])},
+                {"missing": [e for e in episode_indices if e not in bodies]},
+            )
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 썸네일 일괄 로드 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"썸네일 일괄 로드 실패: {str(e)}")
+
+
+@app.get("/api/libero/episode/{episode_index}/thumbnail.jpg")
+async def get_episode_thumbnail_image(episode_index: int, request: Request):
+    """에피소드의 작은 썸네일 JPEG를 그대로 반환 (HTTP 캐시 가능)"""
+    try:
+        if libero_df is not None and episode_index not in episode_lookup:
             raise HTTPException(
                 status_code=404, detail=f"에피소드 {episode_index}를 찾을 수 없습니다"
             )
 
-        row = first_frame.row(0, named=True)
-        logger.info(f"✅ 에피소드 {episode_index} 첫 프레임 발견")
+        # 미리보기 사이드카는 배치 파일과 따로 다시 만들 수 있으므로 매번 재검증
+        etag = dataset_etag("thumbnail", episode_index, PREVIEW_THUMBNAIL_SIZE, "jpg")
+        headers = conditional_headers(etag)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        _, jpeg_bytes = (await run_blocking(build_thumbnail_jpegs, [episode_index]))[episode_index]
+        return Response(content=jpeg_bytes, media_type="image/jpeg", headers=headers)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 썸네일 이미지 {episode_index} 로드 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"썸네일 이미지 로드 실패: {str(e)}")
+
 
-        result = {
+@app.get("/api/libero/episode/{episode_index}/sprite", response_class=FastJSONResponse)
+async def get_episode_sprite(episode_index: int, request: Request):
+    """타임라인 스크러빙용 스프라이트 시트의 타일 크기와 프레임별 오프셋 반환"""
+    try:
+        headers = conditional_headers(dataset_etag("sprite", episode_index))
+        episode_exists = libero_df is None or episode_index in episode_lookup
+        if episode_exists and is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        sprite = await run_blocking(load_episode_sprite, episode_index)
+        if sprite is None:
+            raise HTTPException(
+                status_code=404, detail=f"에피소드 {episode_index}를 찾을 수 없습니다"
+            )
+
+        return FastJSONResponse(
+            {
+                "episode_index": episode_index,
+                "frame_step": sprite["frame_step"],
+                "tile_width": sprite["tile_width"],
+                "tile_height": sprite["tile_height"],
+                "columns": sprite["sprite_columns"],
+                "frames": sprite["sprite_offsets"],
+            },
+            headers=headers,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 스프라이트 {episode_index} 로드 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"스프라이트 로드 실패: {str(e)}")
+
+
+@app.get("/api/libero/episode/{episode_index}/sprite.jpg")
+async def get_episode_sprite_image(episode_index: int, request: Request):
+    """스프라이트 시트 JPEG를 그대로 반환 (HTTP 캐시 가능)"""
+    try:
+        etag = dataset_etag("sprite", episode_index, "jpg")
+        headers = conditional_headers(etag)
+        episode_exists = libero_df is None or episode_index in episode_lookup
+        if episode_exists and is_not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        sprite = await run_blocking(load_episode_sprite, episode_index)
+        if sprite is None:
+            raise HTTPException(
+                status_code=404, detail=f"에피소드 {episode_index}를 찾을 수 없습니다"
+            )
+
+        return Response(content=sprite["sprite"], media_type="image/jpeg", headers=headers)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 스프라이트 이미지 {episode_index} 로드 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"스프라이트 이미지 로드 실패: {str(e)}")
+
+
+@app.get("/api/libero/episode/{episode_index}/frame/{frame}/{camera}.jpg")
+async def get_episode_frame_image(
+    episode_index: int,
+    frame: int,
+    camera: str,
+    request: Request,
+    size: Optional[int] = None,
+    quality: Optional[str] = None,
+):
+    """단일 프레임의 JPEG 이미지를 그대로 반환 (HTTP 캐시 가능, size/quality로 화질 단계 선택)"""
+    try:
+        if camera not in FRAME_CAMERAS:
+            raise HTTPException(
+                status_code=404, detail=f"카메라 {camera}를 찾을 수 없습니다"
+            )
+        column, column_size = select_image_variant(
+            FRAME_CAMERAS[camera], image_target_size(size, quality)
+        )
+
+        if libero_df is None:
+            frame_total = 120 + (episode_index % 80)  # get_episode 더미 데이터와 동일
+        else:
+            entry = episode_lookup.get(episode_index)
+            frame_total = entry["length"] if entry else 0
+
+        if not 0 <= frame < frame_total:
+            raise HTTPException(
+                status_code=404,
+                detail=f"에피소드 {episode_index}의 프레임 {frame}를 찾을 수 없습니다",
+            )
+
+        # 데이터셋 버전 + 위치로 ETag를 만들므로 이미지를 읽지 않고도 304 응답 가능
+        etag = dataset_etag(episode_index, frame, camera, column)
+        headers = conditional_headers(etag, IMMUTABLE_CACHE_CONTROL)
+
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        if libero_df is None:
+            jpeg_bytes = await run_blocking(
+                dummy_jpeg, f"{camera} {frame}", size=min(column_size, 256)
+            )
+        elif column in jpeg_pack_columns:
+            # 오프셋 인덱스로 팩에서 바로 읽음 (row group 압축 해제 없음)
+            jpeg_bytes = await run_blocking(read_pack_frame, episode_index, column, frame)
+        else:
+            jpeg_bytes = (
+                await run_blocking(load_episode_window, entry, frame, 1, [column])
+            )[column][0]
+
+        return Response(content=jpeg_bytes, media_type="image/jpeg", headers=headers)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 프레임 이미지 {episode_index}/{frame}/{camera} 로드 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"프레임 이미지 로드 실패: {str(e)}")
+
+
+def require_jpeg_pack(episode_index, camera, size=None, quality=None):
+    """JPEG 팩 엔드포인트 공통 검증: 요청한 카메라/화질 단계의 팩 컬럼 반환"""
+    if camera not in FRAME_CAMERAS:
+        raise HTTPException(status_code=404, detail=f"카메라 {camera}를 찾을 수 없습니다")
+    column, _ = select_image_variant(FRAME_CAMERAS[camera], image_target_size(size, quality))
+    if column not in jpeg_pack_columns:
+        raise HTTPException(
+            status_code=404,
+            detail=f"{column} JPEG 팩이 없습니다 (convert_to_polars.py --export-packs로 생성)",
+        )
+    if episode_index not in episode_lookup:
+        raise HTTPException(
+            status_code=404, detail=f"에피소드 {episode_index}를 찾을 수 없습니다"
+        )
+    return column
+
+
+@app.get("/api/libero/episode/{episode_index}/pack/{camera}/index", response_class=FastJSONResponse)
+async def get_episode_jpeg_pack_index(
+    episode_index: int,
+    camera: str,
+    request: Request,
+    size: Optional[int] = None,
+    quality: Optional[str] = None,
+):
+    """JPEG 팩의 프레임별 바이트 오프셋 반환 (i번째 프레임 = offsets[i] ~ offsets[i+1]-1 바이트)"""
+    try:
+        column = require_jpeg_pack(episode_index, camera, size, quality)
+        headers = conditional_headers(
+            dataset_etag("pack-index", episode_index, column), IMMUTABLE_CACHE_CONTROL
+        )
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        _, offsets = await run_blocking(open_jpeg_pack, episode_index, column)
+        return FastJSONResponse(
+            {
+                "episode_index": episode_index,
+                "camera": camera,
+                "column": column,
+                "frame_count": len(offsets) - 1,
+                "offsets": offsets.tolist(),
+            },
+            headers=headers,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ JPEG 팩 인덱스 {episode_index}/{camera} 로드 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"JPEG 팩 인덱스 로드 실패: {str(e)}")
+
+
+@app.get("/api/libero/episode/{episode_index}/pack/{camera}")
+async def get_episode_jpeg_pack(
+    episode_index: int,
+    camera: str,
+    request: Request,
+    size: Optional[int] = None,
+    quality: Optional[str] = None,
+):
+    """에피소드 JPEG 팩을 반환 (Range 요청 시 206으로 해당 프레임/프레임 구간만 전송)"""
+    try:
+        column = require_jpeg_pack(episode_index, camera, size, quality)
+        headers = conditional_headers(
+            dataset_etag("pack", episode_index, column), IMMUTABLE_CACHE_CONTROL
+        )
+        headers["Accept-Ranges"] = "bytes"
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        data, _ = await run_blocking(open_jpeg_pack, episode_index, column)
+        total = len(data)
+        byte_range = None
+        range_header = request.headers.get("range")
+        # If-Range가 현재 ETag와 다르면 Range를 무시하고 전체를 보냄
+        if range_header and request.headers.get("if-range", headers["ETag"]) == headers["ETag"]:
+            try:
+                byte_range = parse_byte_range(range_header, total)
+            except ValueError as e:
+                return Response(
+                    content=str(e),
+                    status_code=416,
+                    headers={**headers, "Content-Range": f"bytes */{total}"},
+                )
+
+        if byte_range is None:
+            content = await run_blocking(read_pack_bytes, episode_index, column, 0, total)
+            return Response(
+                content=content, media_type="application/octet-stream", headers=headers
+            )
+
+        start, end = byte_range
+        content = await run_blocking(read_pack_bytes, episode_index, column, start, end)
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{total}"
+        return Response(
+            content=content,
+            status_code=206,
+            media_type="application/octet-stream",
+            headers=headers,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ JPEG 팩 {episode_index}/{camera} 로드 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"JPEG 팩 로드 실패: {str(e)}")
+
+
+def playback_source(episode_index, image_columns):
+    """재생할 에피소드의 (총 프레임 수, task_index, 프레임 로더)를 반환 (없는 에피소드면 None)"""
+    if libero_df is None:
+        total_frames = 120 + (episode_index % 80)
+
+        def load_dummy_frame(position):
+            return dumps_json(
+                dummy_frame(episode_index, 0, position, total_frames, image_columns)
+            )
+
+        return total_frames, episode_index % 40, load_dummy_frame
+
+    entry = episode_lookup.get(episode_index)
+    if entry is None:
+        return None
+
+    def load_frame(position):
+        return load_episode_frames(entry, position, position + 1, image_columns)[0]
+
+    return entry["length"], entry["task_index"], load_frame
+
+
+class PlaybackSession:
+    """WebSocket 재생 채널 하나의 재생 상태, 페이싱, 전송 대기열
+
+    전송 대기열은 (프레임 여부, 메시지) 목록이다. 프레임만 WS_SEND_QUEUE_FRAMES개로 제한해
+    가득 차면 가장 오래된 프레임을 버리고, state/ended/error 같은 제어 메시지는 버리지 않는다.
+    """
+
+    def __init__(self, websocket, total_frames, load_frame):
+        self.websocket = websocket
+        self.total_frames = total_frames
+        self.load_frame = load_frame
+        self.state = {"playing": False, "position": 0, "speed": 1.0, "dropped": 0}
+        self.outbox = deque()
+        self.outbox_ready = asyncio.Event()
+        self.wake = asyncio.Event()
+
+    def enqueue(self, message, is_frame=False):
+        if is_frame and sum(queued for queued, _ in self.outbox) >= WS_SEND_QUEUE_FRAMES:
+            # 가장 오래된 프레임 하나만 버림
+            self.outbox.remove(next(item for item in self.outbox if item[0]))
+            self.state["dropped"] += 1
+        self.outbox.append((is_frame, message))
+        self.outbox_ready.set()
+
+    def drop_queued_frames(self):
+        control = [item for item in self.outbox if not item[0]]
+        self.outbox.clear()
+        self.outbox.extend(control)
+
+    def state_message(self):
+        return {"type": "state", **self.state, "total_frames": self.total_frames}
+
+    async def push_frame(self, position):
+        frame = await run_blocking(self.load_frame, position)
+        # 직렬화된 프레임을 다시 파싱하지 않고 메시지에 그대로 삽입
+        self.enqueue(
+            json_object_with_raw(
+                {"frame": frame},
+                {"type": "frame", "position": position, "dropped": self.state["dropped"]},
+            ),
+            is_frame=True,
+        )
+
+    async def wait_for_wake(self, timeout=None):
+        """명령(wake)이 오거나 timeout이 지날 때까지 대기"""
+        try:
+            await asyncio.wait_for(self.wake.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.wake.clear()
+
+    async def pace(self):
+        """재생 중이면 fps × 속도 간격으로 다음 프레임을 대기열에 넣음"""
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.state["playing"]:
+                await self.wait_for_wake()
+                continue
+
+            started = loop.time()
+            position = self.state["position"]
+            if position >= self.total_frames:
+                self.state["playing"] = False
+                self.enqueue({"type": "ended", "total_frames": self.total_frames})
+                continue
+
+            await self.push_frame(position)
+            # 프레임을 읽는 동안 seek가 들어왔으면 그 위치를 유지
+            if self.state["position"] == position:
+                self.state["position"] = position + 1
+
+            interval = 1 / (LIBERO_FPS * self.state["speed"])
+            await self.wait_for_wake(max(interval - (loop.time() - started), 0))
+
+    async def send(self):
+        while True:
+            if not self.outbox:
+                self.outbox_ready.clear()
+                await self.outbox_ready.wait()
+                continue
+            _, message = self.outbox.popleft()
+            if isinstance(message, bytes):
+                await self.websocket.send_text(message.decode("utf-8"))
+            else:
+                await self.websocket.send_json(message)
+
+    def apply_command(self, command):
+        """클라이언트 명령을 재생 상태에 반영하고 명령 이름을 반환 (잘못된 명령이면 ValueError 등)"""
+        name = command.get("command")
+        if name == "play":
+            if self.state["position"] >= self.total_frames:
+                self.state["position"] = 0
+            self.state["playing"] = True
+        elif name == "pause":
+            self.state["playing"] = False
+        elif name == "seek":
+            self.state["position"] = min(max(int(command["frame"]), 0), self.total_frames - 1)
+            # 이전 위치의 대기 중인 프레임은 보내지 않음
+            self.drop_queued_frames()
+        elif name == "speed":
+            speed = float(command["value"])
+            if not math.isfinite(speed):
+                raise ValueError(f"speed는 유한한 수여야 합니다: {speed}")
+            self.state["speed"] = min(max(speed, WS_MIN_SPEED), WS_MAX_SPEED)
+        else:
+            raise ValueError(f"알 수 없는 명령: {name}")
+        return name
+
+    async def receive(self):
+        while True:
+            try:
+                name = self.apply_command(json.loads(await self.websocket.receive_text()))
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                self.enqueue({"type": "error", "detail": f"잘못된 명령: {str(e)}"})
+                continue
+
+            self.enqueue(self.state_message())
+            if name == "seek" and not self.state["playing"]:
+                # 일시정지 중 탐색하면 해당 프레임 하나만 전송
+                await self.push_frame(self.state["position"])
+            self.wake.set()
+
+    async def run(self):
+        """페이싱/전송/수신 작업을 함께 실행하고 하나라도 끝나면(연결 종료, 오류) 나머지를 취소"""
+        tasks = [asyncio.create_task(worker()) for worker in (self.pace, self.send, self.receive)]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+@app.websocket("/ws/libero/episode/{episode_index}")
+async def episode_playback(
+    websocket: WebSocket,
+    episode_index: int,
+    size: Optional[int] = None,
+    quality: Optional[str] = None,
+):
+    """서버가 fps에 맞춰 프레임을 푸시하는 에피소드 재생 채널
+
+    클라이언트 명령: {"command": "play"}, {"command": "pause"},
+    {"command": "seek", "frame": n}, {"command": "speed", "value": x}
+    전송 큐가 가득 차면(클라이언트가 느리면) 오래된 프레임부터 버리고 재생 위치는 계속 진행한다.
+    size= / quality= 쿼리 파라미터로 화질 단계를 고른다.
+    """
+    await websocket.accept()
+
+    try:
+        image_columns = select_image_columns(image_target_size(size, quality))
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close(code=1008)
+        return
+
+    source = playback_source(episode_index, image_columns)
+    if source is None:
+        await websocket.send_json(
+            {"type": "error", "detail": f"에피소드 {episode_index}를 찾을 수 없습니다"}
+        )
+        await websocket.close(code=1008)
+        return
+    total_frames, task_index, load_frame = source
+
+    logger.info(f"🔌 에피소드 {episode_index} 재생 채널 연결 ({total_frames} 프레임)")
+
+    await websocket.send_json(
+        {
+            "type": "episode",
             "episode_index": episode_index,
-            "task_index": row["task_index"],
-            "thumbnail": row["main_image"],  # 이미 base64 인코딩된 상태
+            "task_index": task_index,
+            "total_frames": total_frames,
+            "fps": LIBERO_FPS,
         }
-        thumbnail_cache[episode_index] = result
-        return result
+    )
 
+    session = PlaybackSession(websocket, total_frames, load_frame)
+    try:
+        await session.run()
+    except WebSocketDisconnect:
+        logger.info(
+            f"🔌 에피소드 {episode_index} 재생 채널 종료 (버린 프레임 {session.state['dropped']}개)"
+        )
     except Exception as e:
-        logger.error(f"❌ 썸네일 {episode_index} 로드 실패: {str(e)}")
-        if "찾을 수 없습니다" in str(e):
-            raise e
-        raise HTTPException(status_code=500, detail=f"썸네일 로드 실패: {str(e)}")
+        logger.error(f"❌ 에피소드 {episode_index} 재생 채널 오류: {e}")
+        logger.error(f"스택트레이스:\n{traceback.format_exc()}")
 
 
 @app.post("/api/libero/tagging/{session_id}")
 async def save_libero_tagging_data(session_id: str, data: LiberoTaggingData):
     """Libero 태깅 데이터 저장"""
     try:
-        os.makedirs("tagging_data", exist_ok=True)
         file_path = f"tagging_data/libero_{session_id}.json"
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data.dict(), f, ensure_ascii=False, indent=2)
+        await run_blocking(write_json_file, file_path, data.dict())
 
         return {
             "message": "태깅 데이터 저장 완료",
@@ -825,10 +2274,7 @@ async def load_libero_tagging_data(session_id: str):
                 status_code=404, detail="태깅 데이터를 찾을 수 없습니다"
             )
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        return data
+        return await run_blocking(read_json_file, file_path)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="태깅 데이터를 찾을 수 없습니다")
     except Exception as e:
@@ -849,6 +2295,8 @@ async def get_cache_stats():
         cache_stats = {
             "episode_cache_size": len(episode_cache),
             "thumbnail_cache_size": len(thumbnail_cache),
+            "episode_cache": episode_cache.stats(),
+            "thumbnail_cache": thumbnail_cache.stats(),
             "memory_usage_mb": memory_info.rss / 1024 / 1024,
             "memory_percent": psutil.Process().memory_percent(),
             "dataset_loaded": libero_df is not None,
@@ -862,6 +2310,8 @@ async def get_cache_stats():
         return {
             "episode_cache_size": len(episode_cache),
             "thumbnail_cache_size": len(thumbnail_cache),
+            "episode_cache": episode_cache.stats(),
+            "thumbnail_cache": thumbnail_cache.stats(),
             "dataset_loaded": libero_df is not None,
             "dataset_error": dataset_load_error,
             "note": "psutil 미설치로 메모리 정보 불가",
@@ -875,13 +2325,8 @@ async def get_cache_stats():
 async def clear_cache():
     """캐시 초기화"""
     try:
-        global episode_cache, thumbnail_cache
-
-        old_episode_count = len(episode_cache)
-        old_thumbnail_count = len(thumbnail_cache)
-
-        episode_cache.clear()
-        thumbnail_cache.clear()
+        old_episode_count = episode_cache.clear()
+        old_thumbnail_count = thumbnail_cache.clear()
 
         # 가비지 컬렉션 강제 실행
         import gc
@@ -911,6 +2356,9 @@ async def health_check():
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "dataset_loaded": libero_df is not None,
+            "load_mode": LIBERO_LOAD_MODE,
+            "worker_pid": os.getpid(),
+            "jpeg_packs": sorted(jpeg_pack_columns),
             "dataset_error": dataset_load_error,
             "cache_sizes": {
                 "episodes": len(episode_cache),
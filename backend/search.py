@@ -0,0 +1,224 @@
+"""
+상태/액션 궤적 검색: 구조화된 조건을 Polars 표현식으로 컴파일해 프레임 테이블 전체에 벡터 연산으로 적용
+"""
+
+import polars as pl
+
+from libero_data import STATE_DIM, ACTION_DIM
+
+# 검색 테이블을 만들 때 읽는 컬럼 (이미지 컬럼은 읽지 않음)
+SEARCH_SOURCE_COLUMNS = ["episode_index", "frame_index", "task_index", "state", "actions"]
+# 엔드이펙터 위치 state 차원 (x, y, z)과 그리퍼 명령 action 차원 (-1 열기, 1 닫기)
+POSITION_DIMS = (0, 1, 2)
+GRIPPER_ACTION_DIM = ACTION_DIM - 1
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 1000
+GRIPPER_EVENTS = ("close", "open", "any")
+GRIPPER_STATES = ("closed", "open")
+
+
+def state_column(dim):
+    """state 차원별 검색 컬럼 이름"""
+    return f"state_{dim}"
+
+
+def action_column(dim):
+    """actions 차원별 검색 컬럼 이름"""
+    return f"action_{dim}"
+
+
+def build_search_frames(frames, fps):
+    """검색용 프레임 테이블 생성: 키 컬럼 + state/actions 차원별 컬럼 + 파생 컬럼
+
+    (episode_index, frame_index) 순으로 정렬해 한 번 만들어 두면 이후 검색은 메모리 안의 벡터 연산만 한다.
+    파생 컬럼: ee_speed(엔드이펙터 속도, m/s), gripper_closed / gripper_was_closed(현재/이전 프레임 그리퍼 명령)
+    """
+    episode = pl.col("episode_index")
+    return (
+        frames.select(SEARCH_SOURCE_COLUMNS)
+        .sort(["episode_index", "frame_index"])
+        .select(
+            "episode_index",
+            "frame_index",
+            "task_index",
+            *[pl.col("state").arr.get(dim).alias(state_column(dim)) for dim in range(STATE_DIM)],
+            *[pl.col("actions").arr.get(dim).alias(action_column(dim)) for dim in range(ACTION_DIM)],
+        )
+        .with_columns(
+            # 같은 에피소드 안의 이전 프레임과의 위치 차이 (에피소드 첫 프레임은 null)
+            (
+                pl.sum_horizontal(
+                    [pl.col(state_column(dim)).diff().over(episode) ** 2 for dim in POSITION_DIMS]
+                ).sqrt()
+                * fps
+            ).alias("ee_speed"),
+            (pl.col(action_column(GRIPPER_ACTION_DIM)) > 0).alias("gripper_closed"),
+        )
+        .with_columns(pl.col("gripper_closed").shift(1).over(episode).alias("gripper_was_closed"))
+        .collect()
+    )
+
+
+def range_expression(column, predicate):
+    """min/max(포함) 범위 조건 표현식 (둘 중 하나 이상 필요)"""
+    low, high = predicate.get("min"), predicate.get("max")
+    if low is None and high is None:
+        raise ValueError(f"{predicate.get('type')} 조건에는 min 또는 max가 필요합니다")
+    for bound in (low, high):
+        if bound is not None and (isinstance(bound, bool) or not isinstance(bound, (int, float))):
+            raise ValueError(f"{predicate.get('type')} 조건의 min/max는 숫자여야 합니다")
+
+    expression = pl.col(column)
+    if low is not None and high is not None:
+        return expression.is_between(low, high)
+    return expression >= low if low is not None else expression <= high
+
+
+def dim_argument(predicate, size):
+    """state/action 조건의 차원 번호 검증"""
+    dim = predicate.get("dim")
+    if isinstance(dim, bool) or not isinstance(dim, int) or not 0 <= dim < size:
+        raise ValueError(f"{predicate['type']} 조건의 dim은 0-{size - 1} 사이 정수여야 합니다")
+    return dim
+
+
+def membership_expression(column, predicate):
+    """값 목록 포함 조건 표현식"""
+    values = predicate.get("in")
+    if not isinstance(values, list) or not values or not all(
+        isinstance(value, int) and not isinstance(value, bool) for value in values
+    ):
+        raise ValueError(f"{predicate['type']} 조건의 in은 정수 목록이어야 합니다")
+    return pl.col(column).is_in(values)
+
+
+def gripper_expression(predicate):
+    """그리퍼 명령 전환(event) 또는 상태(state) 조건 표현식"""
+    closed, was_closed = pl.col("gripper_closed"), pl.col("gripper_was_closed")
+    event, state = predicate.get("event"), predicate.get("state")
+    if event is not None:
+        if event not in GRIPPER_EVENTS:
+            raise ValueError(f"gripper event는 {', '.join(GRIPPER_EVENTS)} 중 하나여야 합니다")
+        if event == "close":
+            return closed & ~was_closed
+        if event == "open":
+            return ~closed & was_closed
+        return closed != was_closed
+    if state not in GRIPPER_STATES:
+        raise ValueError(
+            f"gripper 조건에는 event({', '.join(GRIPPER_EVENTS)}) 또는 "
+            f"state({', '.join(GRIPPER_STATES)})가 필요합니다"
+        )
+    return closed if state == "closed" else ~closed
+
+
+def compile_predicate(predicate):
+    """조건 하나를 불리언 Polars 표현식으로 변환 (잘못된 조건이면 ValueError)
+
+    - {"type": "gripper", "event": "close" | "open" | "any"} 또는 {"type": "gripper", "state": "closed" | "open"}
+    - {"type": "speed", "min": 0.1, "max": 0.5}: 엔드이펙터 속도(m/s)
+    - {"type": "state" | "action", "dim": 6, "min": -1, "max": 0}: 차원별 값 범위
+    - {"type": "task" | "episode", "in": [1, 2]}: 태스크/에피소드 번호 목록
+    """
+    if not isinstance(predicate, dict):
+        raise ValueError("조건은 객체여야 합니다")
+
+    kind = predicate.get("type")
+    if kind == "gripper":
+        return gripper_expression(predicate)
+    if kind == "speed":
+        return range_expression("ee_speed", predicate)
+    if kind == "state":
+        return range_expression(state_column(dim_argument(predicate, STATE_DIM)), predicate)
+    if kind == "action":
+        return range_expression(action_column(dim_argument(predicate, ACTION_DIM)), predicate)
+    if kind == "task":
+        return membership_expression("task_index", predicate)
+    if kind == "episode":
+        return membership_expression("episode_index", predicate)
+    raise ValueError(f"지원하지 않는 조건 종류입니다: {kind}")
+
+
+def parse_cursor(cursor):
+    """'episode_index:start_frame' 형식 커서를 (에피소드, 시작 프레임)으로 변환"""
+    if cursor is None:
+        return None
+    try:
+        episode_index, start_frame = (int(part) for part in str(cursor).split(":"))
+    except ValueError:
+        raise ValueError("cursor는 '에피소드:시작 프레임' 형식이어야 합니다") from None
+    return episode_index, start_frame
+
+
+def parse_search_query(query):
+    """검색 요청 본문을 검증해 실행 계획(dict)으로 변환
+
+    본문: {"predicates": [...], "match": "all" | "any", "min_frames": 1, "limit": 50, "cursor": null}
+    """
+    predicates = query.get("predicates")
+    if not isinstance(predicates, list) or not predicates:
+        raise ValueError("predicates는 비어 있지 않은 조건 목록이어야 합니다")
+    match = query.get("match", "all")
+    if match not in ("all", "any"):
+        raise ValueError("match는 all 또는 any여야 합니다")
+
+    expressions = [compile_predicate(predicate) for predicate in predicates]
+    mask = pl.all_horizontal(expressions) if match == "all" else pl.any_horizontal(expressions)
+
+    min_frames = query.get("min_frames", 1)
+    limit = query.get("limit", DEFAULT_SEARCH_LIMIT)
+    for name, value in (("min_frames", min_frames), ("limit", limit)):
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"{name}는 1 이상의 정수여야 합니다")
+
+    return {
+        # 에피소드 첫 프레임의 이전 프레임 비교처럼 null이 나오는 조건은 불일치로 처리
+        "mask": mask.fill_null(False),
+        "min_frames": min_frames,
+        "limit": min(limit, MAX_SEARCH_LIMIT),
+        "cursor": parse_cursor(query.get("cursor")),
+    }
+
+
+def find_hits(search_frames, mask, min_frames=1):
+    """조건을 만족하는 연속 프레임 구간을 (episode_index, start_frame) 순 DataFrame으로 반환
+
+    end_frame은 구간 다음 프레임 번호(미포함)이다.
+    """
+    return (
+        search_frames.lazy()
+        .select("episode_index", "frame_index", "task_index", mask.alias("match"))
+        .with_columns(pl.col("match").rle_id().over("episode_index").alias("run"))
+        .filter(pl.col("match"))
+        .group_by("episode_index", "run")
+        .agg(
+            pl.col("task_index").first(),
+            pl.col("frame_index").min().alias("start_frame"),
+            (pl.col("frame_index").max() + 1).alias("end_frame"),
+            pl.len().alias("frame_count"),
+        )
+        .filter(pl.col("frame_count") >= min_frames)
+        .drop("run")
+        .sort(["episode_index", "start_frame"])
+        .collect()
+    )
+
+
+def search_episode_ranges(search_frames, plan):
+    """검색 실행 후 (커서 다음 구간 목록, 다음 페이지 커서, 전체 구간 수) 반환"""
+    hits = find_hits(search_frames, plan["mask"], plan["min_frames"])
+    page = hits
+    if plan["cursor"] is not None:
+        episode_index, start_frame = plan["cursor"]
+        page = hits.filter(
+            (pl.col("episode_index") > episode_index)
+            | ((pl.col("episode_index") == episode_index) & (pl.col("start_frame") > start_frame))
+        )
+
+    rows = page.head(plan["limit"] + 1).to_dicts()
+    has_more = len(rows) > plan["limit"]
+    rows = rows[: plan["limit"]]
+    next_cursor = (
+        f"{rows[-1]['episode_index']}:{rows[-1]['start_frame']}" if rows and has_more else None
+    )
+    return rows, next_cursor, hits.height
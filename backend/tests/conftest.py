@@ -0,0 +1,39 @@
+"""백엔드 테스트 공용 픽스처: tmp 디렉토리의 작은 합성 데이터셋으로 앱을 시작"""
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from generate_synthetic_libero import generate_synthetic_dataset  # noqa: E402
+from libero_data import export_ipc_snapshot  # noqa: E402
+
+
+@pytest.fixture
+def load_mode():
+    """앱의 LIBERO_LOAD_MODE (테스트에서 parametrize로 바꿀 수 있음)"""
+    return "lazy"
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch, load_mode):
+    """작은 합성 데이터셋을 tmp 디렉토리에 만들고 앱이 그 데이터를 읽도록 설정"""
+    generate_synthetic_dataset(
+        output_dir=str(tmp_path), episodes=2, tasks=1, min_frames=4, max_frames=6, image_size=32
+    )
+    if load_mode == "mmap":
+        # 서버 워커는 스냅샷을 만들지 않으므로 미리 생성
+        export_ipc_snapshot(str(tmp_path))
+    monkeypatch.setattr(main, "DATA_PATH", str(tmp_path))
+    monkeypatch.setattr(main, "LIBERO_LOAD_MODE", load_mode)
+    main.episode_cache.clear()
+    return tmp_path
+
+
+@pytest.fixture
+def client(dataset):
+    with TestClient(main.app) as test_client:
+        yield test_client
@@ -0,0 +1,50 @@
+"""느린 에피소드 요청이 이벤트 루프를 막지 않는지 확인하는 테스트"""
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+SLOW_SECONDS = 1.0
+
+
+def test_health_not_blocked_by_slow_episode(client, monkeypatch):
+    load_episode_frames = main.load_episode_frames
+    loading = threading.Event()
+
+    def slow_load_episode_frames(*args, **kwargs):
+        loading.set()
+        time.sleep(SLOW_SECONDS)
+        return load_episode_frames(*args, **kwargs)
+
+    monkeypatch.setattr(main, "load_episode_frames", slow_load_episode_frames)
+
+    finished = {}
+
+    def fetch_episode():
+        response = client.get("/api/libero/episode/0")
+        finished["episode"] = time.monotonic()
+        finished["episode_status"] = response.status_code
+
+    episode_thread = threading.Thread(target=fetch_episode)
+    episode_thread.start()
+    assert loading.wait(timeout=10)
+
+    started = time.monotonic()
+    response = client.get("/api/health")
+    finished["health"] = time.monotonic()
+    episode_thread.join(timeout=10)
+
+    assert response.status_code == 200
+    assert finished["episode_status"] == 200
+    assert finished["health"] < finished["episode"]
+    assert finished["health"] - started < SLOW_SECONDS / 2
+
+
+def test_app_restarts_in_same_process(dataset):
+    """종료 후 같은 프로세스에서 다시 시작해도 스레드 풀을 사용할 수 있어야 함"""
+    for _ in range(2):
+        main.episode_cache.clear()
+        with TestClient(main.app) as test_client:
+            assert test_client.get("/api/libero/episode/0").status_code == 200
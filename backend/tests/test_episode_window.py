@@ -0,0 +1,33 @@
+"""에피소드 프레임 윈도우가 에피소드 범위를 벗어나지 않는지 확인하는 테스트"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.mark.parametrize("load_mode", ["lazy", "memory", "mmap"])
+def test_negative_start_frame_rejected(client):
+    response = client.get("/api/libero/episode/1?start_frame=-5&frame_count=10")
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("load_mode", ["lazy", "memory", "mmap"])
+def test_window_stays_inside_episode(client):
+    entry = main.episode_lookup[1]
+    frames = main.load_episode_window(entry, -3, 10, ["episode_index", "frame_index"])
+    assert frames["episode_index"].to_list() == [1] * entry["length"]
+    assert frames["frame_index"].to_list() == list(range(entry["length"]))
+
+    records = main.load_episode_frames(entry, -3, entry["length"] + 5)
+    assert len(records) == entry["length"]
+    assert all(b'"episode_index":1' in record for record in records)
+
+
+@pytest.mark.parametrize("load_mode", ["mmap"])
+def test_mmap_requires_prebuilt_snapshot(dataset, tmp_path):
+    (tmp_path / "libero_frames.arrow").unlink()
+    with TestClient(main.app) as client:
+        info = client.get("/api/libero/info").json()
+    assert info["status"] == "not_loaded"
+    assert "스냅샷" in info["error"]
+    assert not (tmp_path / "libero_frames.arrow").exists()
@@ -0,0 +1,31 @@
+"""WebSocket 재생 채널 명령 처리 테스트"""
+
+
+def test_non_finite_speed_rejected(client):
+    with client.websocket_connect("/ws/libero/episode/0") as ws:
+        assert ws.receive_json()["type"] == "episode"
+        for value in ("NaN", "Infinity"):
+            ws.send_text('{"command": "speed", "value": %s}' % value)
+            assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"command": "speed", "value": 2})
+        message = ws.receive_json()
+        assert message["type"] == "state"
+        assert message["speed"] == 2.0
+
+
+def test_playback_sends_every_frame_then_ended(client):
+    with client.websocket_connect("/ws/libero/episode/0") as ws:
+        total_frames = ws.receive_json()["total_frames"]
+        ws.send_json({"command": "speed", "value": 8})
+        ws.receive_json()
+        ws.send_json({"command": "play"})
+        assert ws.receive_json()["type"] == "state"
+
+        positions = []
+        while True:
+            message = ws.receive_json()
+            if message["type"] == "ended":
+                break
+            positions.append(message["position"])
+        assert positions == list(range(total_frames))
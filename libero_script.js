@@ -12,7 +12,9 @@ class LiberoActionTagger {
         this.sessionId = this.generateSessionId();
         this.liberoInfo = null;
         this.episodes = [];
+        this.episodeCursor = null;
         this.tasks = [];
+        this.episodeSprite = null;
         this.tagTemplates = this.loadTagTemplates();
 
         this.initializeElements();
@@ -36,6 +38,8 @@ class LiberoActionTagger {
             // 에피소드 브라우저
             taskFilter: document.getElementById('taskFilter'),
             loadEpisodesBtn: document.getElementById('loadEpisodesBtn'),
+            episodeSort: document.getElementById('episodeSort'),
+            loadMoreEpisodesBtn: document.getElementById('loadMoreEpisodesBtn'),
             episodeGrid: document.getElementById('episodeGrid'),
 
             // 듀얼 카메라
@@ -60,6 +64,7 @@ class LiberoActionTagger {
             frameInput: document.getElementById('frameInput'),
             goToFrameBtn: document.getElementById('goToFrameBtn'),
             speedSelect: document.getElementById('speedSelect'),
+            qualitySelect: document.getElementById('qualitySelect'),
 
             // 타임라인
             timeline: document.getElementById('timeline'),
@@ -67,6 +72,7 @@ class LiberoActionTagger {
             frameIndicator: document.getElementById('frameIndicator'),
             tagsContainer: document.getElementById('tagsContainer'),
             timelineScale: document.getElementById('timelineScale'),
+            timelinePreview: document.getElementById('timelinePreview'),
             addTagBtn: document.getElementById('addTagBtn'),
 
             // 태그 편집
@@ -102,6 +108,14 @@ class LiberoActionTagger {
             this.loadEpisodes();
         });
 
+        this.elements.episodeSort.addEventListener('change', () => {
+            this.loadEpisodes();
+        });
+
+        this.elements.loadMoreEpisodesBtn.addEventListener('click', () => {
+            this.loadEpisodes(true);
+        });
+
         // 컨트롤 이벤트
         this.elements.playBtn.addEventListener('click', () => {
             this.togglePlay();
@@ -128,6 +142,14 @@ class LiberoActionTagger {
             this.handleTimelineClick(e);
         });
 
+        this.elements.timeline.addEventListener('mousemove', (e) => {
+            this.showTimelinePreview(e);
+        });
+
+        this.elements.timeline.addEventListener('mouseleave', () => {
+            this.elements.timelinePreview.style.display = 'none';
+        });
+
         this.elements.addTagBtn.addEventListener('click', () => {
             this.addNewTag();
         });
@@ -222,32 +244,51 @@ class LiberoActionTagger {
         }
     }
 
-    async loadEpisodes() {
+    async loadEpisodes(append = false) {
         try {
-            this.elements.episodeGrid.innerHTML = '<div class="loading-indicator">에피소드를 로딩 중...</div>';
-            
+            if (!append) {
+                this.elements.episodeGrid.innerHTML = '<div class="loading-indicator">에피소드를 로딩 중...</div>';
+            }
+            this.elements.loadMoreEpisodesBtn.disabled = true;
+
             const taskIndex = this.elements.taskFilter.value;
+            const [sortBy, order] = this.elements.episodeSort.value.split(':');
             const params = new URLSearchParams();
             if (taskIndex) params.append('task_index', taskIndex);
             params.append('limit', '50');
+            params.append('sort_by', sortBy);
+            params.append('descending', order === 'desc');
+            // 다음 페이지는 마지막으로 받은 에피소드를 커서로 요청
+            if (append && this.episodeCursor !== null) params.append('after_episode', this.episodeCursor);
 
             const response = await fetch(`${this.apiBaseUrl}/episodes?${params}`);
             if (!response.ok) {
                 throw new Error(`에피소드 로드 실패: ${response.status}`);
             }
 
-            this.episodes = await response.json();
-            this.displayEpisodes();
+            const episodes = await response.json();
+            this.episodeCursor = response.headers.get('X-Next-Cursor');
+            this.episodes = append ? this.episodes.concat(episodes) : episodes;
+            this.displayEpisodes(episodes, append);
+
+            this.elements.loadMoreEpisodesBtn.style.display = this.episodeCursor !== null ? 'block' : 'none';
+            this.elements.loadMoreEpisodesBtn.disabled = false;
 
         } catch (error) {
-            this.elements.episodeGrid.innerHTML = `<div class="error-message">에피소드 로드 실패: ${error.message}</div>`;
+            this.elements.loadMoreEpisodesBtn.disabled = false;
+            if (!append) {
+                this.elements.episodeGrid.innerHTML = `<div class="error-message">에피소드 로드 실패: ${error.message}</div>`;
+            }
         }
     }
 
-    async displayEpisodes() {
-        this.elements.episodeGrid.innerHTML = '';
+    async displayEpisodes(episodes = this.episodes, append = false) {
+        if (!append) {
+            this.elements.episodeGrid.innerHTML = '';
+        }
+        const episodeCards = new Map();
 
-        for (const episode of this.episodes) {
+        for (const episode of episodes) {
             const episodeCard = document.createElement('div');
             episodeCard.className = 'episode-card';
             episodeCard.innerHTML = `
@@ -266,20 +307,32 @@ class LiberoActionTagger {
             });
 
             this.elements.episodeGrid.appendChild(episodeCard);
-
-            // 비동기로 썸네일 로드
-            this.loadEpisodeThumbnail(episode.episode_index, episodeCard);
+            episodeCards.set(episode.episode_index, episodeCard);
         }
+
+        // 페이지의 썸네일을 한 번의 요청으로 로드
+        this.loadEpisodeThumbnails(episodeCards);
     }
 
-    async loadEpisodeThumbnail(episodeIndex, episodeCard) {
+    async loadEpisodeThumbnails(episodeCards) {
+        if (episodeCards.size === 0) return;
+
         try {
-            const response = await fetch(`${this.apiBaseUrl}/episode/${episodeIndex}/thumbnail`);
+            const response = await fetch(`${this.apiBaseUrl}/thumbnails`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ episode_indices: Array.from(episodeCards.keys()) })
+            });
             if (!response.ok) return;
 
             const data = await response.json();
-            const thumbnail = episodeCard.querySelector('.episode-thumbnail');
-            thumbnail.innerHTML = `<img src="data:image/png;base64,${data.thumbnail}" alt="에피소드 ${episodeIndex}">`;
+            for (const item of data.thumbnails) {
+                const episodeCard = episodeCards.get(item.episode_index);
+                if (!episodeCard) continue;
+
+                const thumbnail = episodeCard.querySelector('.episode-thumbnail');
+                thumbnail.innerHTML = `<img src="data:image/png;base64,${item.thumbnail}" alt="에피소드 ${item.episode_index}">`;
+            }
 
         } catch (error) {
             // 썸네일 로드 실패는 무시
@@ -309,23 +362,107 @@ class LiberoActionTagger {
             const selectedEpisode = this.episodes.find(ep => ep.episode_index === episodeIndex);
             const maxFrames = selectedEpisode ? selectedEpisode.frame_count : 500;
             
-            const response = await fetch(`${this.apiBaseUrl}/episode/${episodeIndex}?frame_count=${maxFrames}`);
+            // 타임라인 미리보기용 스프라이트 시트는 프레임과 별도로 로드
+            this.loadEpisodeSprite(episodeIndex);
+
+            // NDJSON 스트리밍으로 받아 첫 프레임이 도착하는 즉시 표시
+            // 느린 연결에서는 서버에 미리 저장된 작은 화질 단계를 요청
+            const quality = this.elements.qualitySelect.value;
+            const response = await fetch(`${this.apiBaseUrl}/episode/${episodeIndex}?frame_count=${maxFrames}&stream=ndjson&quality=${quality}`);
             if (!response.ok) {
                 throw new Error(`에피소드 로드 실패: ${response.status}`);
             }
 
-            this.currentEpisode = await response.json();
-            this.currentFrameIndex = 0;
-            
-            this.updateUI();
-            this.createTimelineScale();
-            this.enableControls();
+            await this.readEpisodeStream(response);
 
         } catch (error) {
             this.showError(`에피소드 선택 실패: ${error.message}`);
         }
     }
 
+    async loadEpisodeSprite(episodeIndex) {
+        this.episodeSprite = null;
+        try {
+            const response = await fetch(`${this.apiBaseUrl}/episode/${episodeIndex}/sprite`);
+            if (!response.ok) return;
+
+            const sprite = await response.json();
+            sprite.url = `${this.apiBaseUrl}/episode/${episodeIndex}/sprite.jpg`;
+            // 스프라이트 이미지를 미리 받아 두어 첫 호버부터 바로 표시
+            new Image().src = sprite.url;
+            this.episodeSprite = sprite;
+
+        } catch (error) {
+            // 스프라이트 로드 실패 시 미리보기 없이 동작
+        }
+    }
+
+    showTimelinePreview(e) {
+        const sprite = this.episodeSprite;
+        const preview = this.elements.timelinePreview;
+        if (!this.currentEpisode || !sprite || sprite.episode_index !== this.currentEpisode.episode_index) {
+            preview.style.display = 'none';
+            return;
+        }
+
+        const rect = this.elements.timeline.getBoundingClientRect();
+        const hoverX = Math.max(0, Math.min(e.clientX - rect.left, rect.width));
+        const totalFrames = this.currentEpisode.metadata?.total_frames_in_episode || this.currentEpisode.frames.length;
+        const frame = Math.floor((hoverX / rect.width) * (totalFrames - 1));
+        const tile = sprite.frames[Math.min(Math.floor(frame / sprite.frame_step), sprite.frames.length - 1)];
+
+        preview.style.width = `${sprite.tile_width}px`;
+        preview.style.height = `${sprite.tile_height}px`;
+        preview.style.backgroundImage = `url(${sprite.url})`;
+        preview.style.backgroundPosition = `-${tile.x}px -${tile.y}px`;
+        preview.style.left = `${hoverX}px`;
+        preview.textContent = frame;
+        preview.style.display = 'block';
+    }
+
+    async readEpisodeStream(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let episode = null;
+        let buffer = '';
+
+        const handleLine = (line) => {
+            if (!line) return;
+            const record = JSON.parse(line);
+            if (record.error) {
+                throw new Error(record.error);
+            }
+            if (!episode) {
+                // 첫 줄은 에피소드 메타데이터
+                episode = { ...record, frames: [] };
+                this.currentEpisode = episode;
+                this.currentFrameIndex = 0;
+                return;
+            }
+            episode.frames.push(record);
+            if (episode.frames.length === 1) {
+                this.updateUI();
+                this.createTimelineScale();
+                this.enableControls();
+            }
+        };
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            // 그 사이 다른 에피소드가 선택되면 이전 스트림은 중단
+            if (episode && this.currentEpisode !== episode) {
+                reader.cancel();
+                return;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.forEach(handleLine);
+        }
+        handleLine(buffer + decoder.decode());
+    }
+
     showLoading() {
         this.elements.mainPlaceholder.textContent = '에피소드 로딩 중...';
         this.elements.wristPlaceholder.textContent = '에피소드 로딩 중...';
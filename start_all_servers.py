@@ -8,6 +8,7 @@ import os
 import sys
 import time
 import signal
+import argparse
 import subprocess
 import threading
 import requests
@@ -15,10 +16,11 @@ from datetime import datetime
 
 
 class ServerManager:
-    def __init__(self):
+    def __init__(self, workers=1):
         self.frontend_process = None
         self.backend_process = None
         self.running = False
+        self.workers = workers
         
     def check_dependencies(self):
         """필요한 의존성 패키지들이 설치되어 있는지 확인"""
@@ -82,20 +84,33 @@ class ServerManager:
             print("❌ backend 디렉터리를 찾을 수 없습니다.")
             return False
         
+        command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--host",
+            "0.0.0.0",
+            "--port",
+            "8001",
+        ]
+        env = os.environ.copy()
+        if self.workers > 1:
+            # 워커마다 데이터를 복사하지 않도록 Arrow IPC 스냅샷을 한 번 만들고 메모리 매핑
+            print(f"👥 멀티 워커 모드: {self.workers}개 워커 (메모리 매핑 공유)")
+            from start_backend import prepare_mmap_snapshot
+
+            prepare_mmap_snapshot(backend_dir)
+            command += ["--workers", str(self.workers)]
+            env["LIBERO_LOAD_MODE"] = "mmap"
+        else:
+            command.append("--reload")
+
         try:
             self.backend_process = subprocess.Popen(
-                [
-                    sys.executable,
-                    "-m",
-                    "uvicorn",
-                    "main:app",
-                    "--host",
-                    "0.0.0.0",
-                    "--port",
-                    "8001",
-                    "--reload"
-                ],
+                command,
                 cwd=backend_dir,
+                env=env,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE
             )
@@ -288,7 +303,16 @@ class ServerManager:
 
 def main():
     """메인 함수"""
-    manager = ServerManager()
+    parser = argparse.ArgumentParser(description="프론트엔드 + 백엔드 서버 동시 실행")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="백엔드 uvicorn 워커 수 (2 이상이면 Arrow IPC 스냅샷을 메모리 매핑해서 공유)",
+    )
+    args = parser.parse_args()
+
+    manager = ServerManager(args.workers)
     
     try:
         success = manager.run()
@@ -5,6 +5,7 @@
 
 import os
 import sys
+import argparse
 import subprocess
 
 
@@ -32,8 +33,29 @@ def check_dependencies():
     return True
 
 
-def start_server():
-    """FastAPI 서버 시작"""
+def prepare_mmap_snapshot(backend_dir):
+    """멀티 워커 모드용 Arrow IPC 스냅샷을 워커 시작 전에 한 번만 생성"""
+    sys.path.insert(0, backend_dir)
+    from libero_data import export_ipc_snapshot
+
+    data_path = os.environ.get("LIBERO_DATA_PATH", "./data")
+    if not os.path.isabs(data_path):
+        data_path = os.path.join(backend_dir, data_path)
+
+    print("🗜️  Arrow IPC 스냅샷 확인 중...")
+    snapshot_path = export_ipc_snapshot(data_path)
+    if snapshot_path:
+        print(f"✅ 스냅샷 준비 완료: {snapshot_path}")
+    else:
+        print("⚠️  Parquet 파일이 없어 스냅샷을 만들지 않았습니다 (더미 데이터 모드)")
+
+
+def start_server(workers=1):
+    """FastAPI 서버 시작
+
+    workers가 2 이상이면 --reload 없이 여러 워커로 띄우고, 모든 워커가 같은
+    Arrow IPC 스냅샷을 메모리 매핑하도록 LIBERO_LOAD_MODE=mmap을 설정한다.
+    """
     print("🚀 로봇 행동 태깅 FastAPI 서버를 시작합니다...")
     print("📋 API 문서: http://localhost:8001/docs")
     print("🎯 프론트엔드: http://localhost:8000")
@@ -45,22 +67,28 @@ def start_server():
         print("❌ backend 디렉터리를 찾을 수 없습니다.")
         return False
 
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--host",
+        "0.0.0.0",
+        "--port",
+        "8001",
+    ]
+    env = os.environ.copy()
+    if workers > 1:
+        print(f"👥 멀티 워커 모드: {workers}개 워커 (메모리 매핑 공유)")
+        prepare_mmap_snapshot(backend_dir)
+        command += ["--workers", str(workers)]
+        env["LIBERO_LOAD_MODE"] = "mmap"
+    else:
+        command.append("--reload")
+
     try:
         # uvicorn으로 서버 시작
-        subprocess.run(
-            [
-                sys.executable,
-                "-m",
-                "uvicorn",
-                "main:app",
-                "--host",
-                "0.0.0.0",
-                "--port",
-                "8001",
-                "--reload",
-            ],
-            cwd=backend_dir,
-        )
+        subprocess.run(command, cwd=backend_dir, env=env)
     except KeyboardInterrupt:
         print("\n🛑 서버가 종료되었습니다.")
     except Exception as e:
@@ -71,10 +99,19 @@ def start_server():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로봇 행동 태깅 FastAPI 백엔드 실행")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="uvicorn 워커 수 (2 이상이면 Arrow IPC 스냅샷을 메모리 매핑해서 공유)",
+    )
+    args = parser.parse_args()
+
     print("🤖 로봇 행동 태깅 도구 - FastAPI 백엔드")
     print("=" * 50)
 
     if not check_dependencies():
         sys.exit(1)
 
-    start_server()
+    start_server(args.workers)